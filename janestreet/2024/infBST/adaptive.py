@@ -0,0 +1,200 @@
+"""
+Adaptive-precision solver for p(n) with a certified enclosure.
+
+Works on the log-space equation of logsolve.py,
+
+    F(y) = n y + log1p(n + n e^y) - L = 0,   L = ln(-expm1(-ln2 / 2^n)),  p = e^y
+
+in which nothing cancels against 1 - K: expm1 computes 1 - 2^(-1/2^n) to full
+relative precision at any n, so the working precision only has to cover the
+digits asked for plus the log10(n) digits lost in n y + ... - L. Newton
+doubles the number of correct digits per step, so it starts from the float64
+solution of logsolve.py and doubles the precision along with it
+(15 -> 30 -> 60 -> ... digits). L is computed once at the final precision and
+rounded for the cheaper steps.
+
+The result is certified with mpmath interval arithmetic: F is increasing
+(F' > n), so F(y_lo) < 0 < F(y_hi) on intervals proves the root lies in
+[y_lo, y_hi]. If the check fails the solve is repeated with more digits.
+"""
+
+import collections
+import sys
+import time
+
+from mpmath import iv, mp
+
+from logsolve import solve_log_p
+
+Certificate = collections.namedtuple("Certificate", ["n", "p", "p_bounds", "dps", "steps"])
+
+
+def guard_digits(n):
+    """
+    Extra digits needed for n
+
+    Args:
+        n: The parameter n
+
+    Returns:
+        Digits lost to cancellation in F (|n y| ~ n ln2, |F| ~ 0), plus a margin
+    """
+    return len(str(int(n))) + 5
+
+
+def log_rhs(n, ctx=mp):
+    """
+    L = ln(1 - 2^(-1/2^n)) = ln(-expm1(-ln2 / 2^n)) in the mpmath context ctx
+
+    Args:
+        n: The parameter n
+        ctx: mpmath.mp or mpmath.iv
+
+    Returns:
+        L at ctx's current precision
+    """
+    x = ctx.ln2 * ctx.power(2, -int(n))
+    return ctx.log(-ctx.expm1(-x))
+
+
+def residual(y, n, L, ctx=mp):
+    """
+    F(y) in the mpmath context ctx
+
+    Args:
+        y: ln p
+        n: The parameter n
+        L: log_rhs(n)
+        ctx: mpmath.mp or mpmath.iv
+
+    Returns:
+        F(y), increasing in y, zero at the solution
+    """
+    return n * y + ctx.log1p(n * (1 + ctx.exp(y))) - L
+
+
+def newton(n, dps, y0=None, start_digits=15, max_steps=100):
+    """
+    Precision-doubling Newton iteration for y = ln p
+
+    Args:
+        n: The parameter n
+        dps: Decimal digits wanted
+        y0: Starting y (default: logsolve's float solution)
+        start_digits: Digits y0 is good to; precision doubles from there
+        max_steps: Maximum number of Newton steps
+
+    Returns:
+        (y, steps) with y an mpf good to about dps digits
+    """
+    n = int(n)
+    guard = guard_digits(n)
+    if y0 is None:
+        y0 = float(solve_log_p(n)[1])
+
+    with mp.workdps(dps + guard):
+        L_full = log_rhs(n)
+        y = mp.mpf(y0)
+        tolerance = abs(y) * mp.mpf(10) ** (-dps / 2)
+
+    digits = max(1, min(start_digits, dps))
+    for steps in range(1, max_steps + 1):
+        digits = min(2 * digits, dps)
+        with mp.workdps(digits + guard):
+            L = +L_full
+            t = n * mp.exp(y)
+            F = n * y + mp.log1p(n + t) - L
+            step = F / (n + t / (1 + n + t))
+            y = y - step
+        # a step below 10^(-dps/2) leaves y good to dps digits, also if y0 was worse than claimed
+        if digits >= dps and abs(step) <= tolerance:
+            break
+    return y, steps
+
+
+def certify(n, y, dps):
+    """
+    Interval proof that the root of F lies within 10^-dps (relative) of y
+
+    Args:
+        n: The parameter n
+        y: Approximate ln p
+        dps: Decimal digits of the claimed enclosure
+
+    Returns:
+        (p_lo, p_hi) as mpf if F changes sign across the enclosure, else None
+    """
+    n = int(n)
+    work = dps + guard_digits(n)
+    with mp.workdps(work):
+        radius = abs(y) * mp.mpf(10) ** (-dps)
+        ends = y - radius, y + radius
+    saved = iv.dps
+    iv.dps = work
+    try:
+        y_lo, y_hi = iv.mpf(ends[0]), iv.mpf(ends[1])
+        L = log_rhs(n, iv)
+        if residual(y_lo, n, L, iv).b < 0 < residual(y_hi, n, L, iv).a:
+            # endpoints are exact at iv's precision, so converting them at the same one loses nothing
+            with mp.workdps(work):
+                return mp.mpf(iv.exp(y_lo).a), mp.mpf(iv.exp(y_hi).b)
+        return None
+    finally:
+        iv.dps = saved
+
+
+def solve(n, dps=50, y0=None, start_digits=15, max_tries=4):
+    """
+    Certified p for a given n, at precision adapted to n and dps
+
+    Args:
+        n: The parameter n
+        dps: Decimal digits wanted
+        y0: Optional starting ln p (e.g. from a neighbouring n)
+        start_digits: Digits y0 is good to
+        max_tries: How many times to double the digits if certification fails
+
+    Returns:
+        Certificate(n, p, p_bounds, dps, steps): p_bounds encloses the exact p,
+        dps is the precision that was needed, steps the Newton steps taken
+    """
+    for _ in range(max_tries):
+        y, steps = newton(n, dps, y0, start_digits)
+        bounds = certify(n, y, dps)
+        if bounds is not None:
+            with mp.workdps(dps):
+                return Certificate(int(n), +mp.exp(y), bounds, dps, steps)
+        dps *= 2
+    raise ArithmeticError(f"could not certify p({n}) at {dps // 2} digits")
+
+
+def main():
+    dps = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    ns = [int(float(a)) for a in sys.argv[2:]] or [1, 10, 100, 1000, 10**4, 10**6, 10**9]
+
+    print(f"{'n':<12} {'p':<{dps + 4}} {'width':<10} {'steps':<6} {'time (ms)':<10}")
+    for n in ns:
+        start = time.perf_counter()
+        cert = solve(n, dps)
+        elapsed = time.perf_counter() - start
+        width = (cert.p_bounds[1] - cert.p_bounds[0]) / cert.p
+        print(f"{n:<12} {mp.nstr(cert.p, dps):<{dps + 4}} {mp.nstr(width, 3):<10} {cert.steps:<6} "
+              f"{1e3 * elapsed:<10.2f}")
+
+    # cost against digits for one large n
+    n = ns[-1]
+    for digits in (50, 100, 200, 400, 800):
+        start = time.perf_counter()
+        cert = solve(n, digits)
+        print(f"n = {n}, {digits} digits: {1e3 * (time.perf_counter() - start):.2f} ms, {cert.steps} Newton steps")
+
+    # agreement with largen.py's fixed-precision Newton where it still converges
+    from largen import compute_p_high_precision
+
+    for n in (1, 10, 100):
+        p, _, _ = compute_p_high_precision(n)
+        print(f"n = {n}: |p - largen| = {mp.nstr(abs(p - solve(n, 45).p), 3)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+One registry for every p(n) solver in this directory.
+
+Every backend is called as solver(n, tol) and returns Result(p, residual,
+evals):
+
+  p         the root as a float or mpf (None if the backend found none),
+  residual  |F(ln p)| / F'(ln p) for the log-space equation of logsolve.py,
+            evaluated at 40+ digits: the Newton estimate of p's relative
+            error, comparable across backends whatever they compute internally,
+  evals     evaluations of the backend's equation (Newton steps count once).
+
+tol is passed on as each backend's own tolerance (or digits, for adaptive).
+Several backends print warnings or only work in some range of n; the
+benchmark harness (benchmark.py) records those failure modes.
+"""
+
+import collections
+import math
+
+from mpmath import mp
+
+import adaptive
+import bracket
+import calc2
+import calc3
+import calc4
+import largen
+import logsolve
+
+Result = collections.namedtuple("Result", ["p", "residual", "evals"])
+
+BACKENDS = {}
+
+
+def register(name):
+    """Decorator adding a solver(n, tol) -> Result to BACKENDS under name."""
+    def wrap(solver):
+        BACKENDS[name] = solver
+        return solver
+    return wrap
+
+
+def relative_residual(n, p, dps=40):
+    """
+    Newton estimate of the relative error of p
+
+    Args:
+        n: The parameter n
+        p: Candidate p (float or mpf)
+        dps: Digits to evaluate at (plus adaptive.guard_digits(n))
+
+    Returns:
+        |F(ln p)| / F'(ln p) as a float, nan if p is not in (0, 1)
+    """
+    if p is None or not 0 < p < 1:
+        return math.nan
+    with mp.workdps(dps + adaptive.guard_digits(n)):
+        y = mp.log(mp.mpf(p))
+        t = n * mp.exp(y)
+        F = adaptive.residual(y, n, adaptive.log_rhs(n))
+        return float(abs(F) / (n + t / (1 + n + t)))
+
+
+def result(n, p, evals):
+    return Result(p, relative_residual(n, p), evals)
+
+
+@register("fixed_point")
+def fixed_point(n, tol):
+    """calc3.compute_p_fixed_point"""
+    p, iterations = calc3.compute_p_fixed_point(n, tolerance=tol)
+    return result(n, p, iterations)
+
+
+@register("newton")
+def newton(n, tol):
+    """calc3.compute_p_newton"""
+    p, iterations = calc3.compute_p_newton(n, tolerance=tol)
+    return result(n, p, iterations)
+
+
+@register("scipy")
+def scipy(n, tol):
+    """calc3.compute_p_scipy"""
+    p, evals = calc3.compute_p_scipy(n, xtol=tol, full_output=True)
+    return result(n, p, evals)
+
+
+@register("scipy_stable")
+def scipy_stable(n, tol):
+    """calc4.compute_p_scipy_stable"""
+    p, evals = calc4.compute_p_scipy_stable(n, xtol=tol, full_output=True)
+    return result(n, p, evals)
+
+
+@register("mpmath")
+def mpmath_newton(n, tol):
+    """calc4.compute_p_mpmath (returns the asymptotic formula above n = 100)"""
+    p, iterations = calc4.compute_p_mpmath(n, tolerance=tol, full_output=True)
+    return result(n, p, iterations)
+
+
+@register("brentq_scan")
+def brentq_scan(n, tol):
+    """calc2.compute_p_brentq, bracketing on a grid over (0, 1)"""
+    p, evals = calc2.compute_p_brentq(n, search_range=(0.0, 1.0), step=0.001, xtol=tol, full_output=True)
+    return result(n, p, evals)
+
+
+@register("bracket_polish")
+def bracket_polish(n, tol):
+    """bracket.solve: float64 grid bracket, polished in mpmath at the digits tol asks for"""
+    p, evals = bracket.solve(n, max(15, math.ceil(-math.log10(tol))))
+    return result(n, p, evals)
+
+
+@register("high_precision")
+def high_precision(n, tol):
+    """largen.compute_p_high_precision"""
+    p, _, iterations = largen.compute_p_high_precision(n, tolerance=tol)
+    return result(n, p, iterations)
+
+
+@register("log_newton")
+def log_newton(n, tol):
+    """logsolve.solve_log_p (vectorized; here for a single n)"""
+    p, _, _, iterations = logsolve.solve_log_p(n, tolerance=max(tol, 1e-15))
+    return result(n, float(p), iterations)
+
+
+@register("adaptive")
+def adaptive_newton(n, tol):
+    """adaptive.solve, certified, at the digits tol asks for"""
+    cert = adaptive.solve(n, max(15, math.ceil(-math.log10(tol))))
+    return result(n, cert.p, cert.steps)
+
+
+def solve(n, tol=1e-12, backend="log_newton"):
+    """
+    p(n) from one registered backend
+
+    Args:
+        n: The parameter n
+        tol: Tolerance passed to the backend
+        backend: Name in BACKENDS
+
+    Returns:
+        Result(p, residual, evals)
+    """
+    return BACKENDS[backend](n, tol)
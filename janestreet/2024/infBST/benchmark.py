@@ -0,0 +1,145 @@
+"""
+Benchmark every backend of backends.py over a standard grid of n.
+
+For each (backend, n) it records the best wall time over a few repeats, the
+evaluations, the relative residual and a status:
+
+  ok            residual <= 10 tol,
+  inaccurate    converged to something, but not to p(n) within 10 tol,
+  no root       returned no p, or one outside (0, 1),
+  warned        printed a warning (non-convergence), result kept as is,
+  timeout       ran past the time limit (SIGALRM, so POSIX only),
+  error: <Exc>  raised.
+
+Then for every n it picks the fastest backend with status ok and prints the
+regimes of n where the same backend wins.
+
+usage: python benchmark.py [tol] [time limit (s)] [backend ...]
+"""
+
+import contextlib
+import io
+import math
+import signal
+import sys
+import time
+
+from backends import BACKENDS
+
+GRID = [1, 2, 3, 5, 10, 20, 30, 50, 100, 200, 500, 1000, 10**4, 10**6]
+
+
+def _expired(signum, frame):
+    raise TimeoutError
+
+
+def run(solver, n, tol, repeats=3, time_limit=10.0):
+    """
+    Time one backend at one n
+
+    Args:
+        solver: A registered backend
+        n: The parameter n
+        tol: Tolerance passed to the backend
+        repeats: Runs to take the best time of (one if a run fails or takes over a second)
+        time_limit: Seconds before a run is abandoned
+
+    Returns:
+        (result, seconds, status); result is None if the backend raised or timed out
+    """
+    best = math.inf
+    previous = signal.signal(signal.SIGALRM, _expired)
+    try:
+        for _ in range(repeats):
+            out = io.StringIO()
+            start = time.perf_counter()
+            try:
+                signal.setitimer(signal.ITIMER_REAL, time_limit)
+                with contextlib.redirect_stdout(out):
+                    result = solver(n, tol)
+            except TimeoutError:
+                return None, time.perf_counter() - start, "timeout"
+            except Exception as e:
+                return None, time.perf_counter() - start, f"error: {type(e).__name__}"
+            finally:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+            seconds = time.perf_counter() - start
+            best = min(best, seconds)
+            if out.getvalue():
+                return result, best, "warned"
+            if seconds > 1.0:
+                break
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+
+    if not math.isfinite(result.residual):
+        return result, best, "no root"
+    if result.residual > 10 * tol:
+        return result, best, "inaccurate"
+    return result, best, "ok"
+
+
+def benchmark(names, grid=GRID, tol=1e-12, repeats=3, time_limit=10.0):
+    """
+    Run every named backend over the grid
+
+    Args:
+        names: Backend names
+        grid: Values of n
+        tol: Tolerance passed to the backends
+        repeats: Timing repeats
+        time_limit: Seconds per run before it counts as a timeout
+
+    Returns:
+        Dict {(name, n): (result, seconds, status)}
+    """
+    return {(name, n): run(BACKENDS[name], n, tol, repeats, time_limit) for n in grid for name in names}
+
+
+def choose(table, names, grid=GRID):
+    """
+    Fastest backend with status ok at every n
+
+    Args:
+        table: Output of benchmark
+        names: Backend names
+        grid: Values of n
+
+    Returns:
+        Dict {n: name or None}
+    """
+    best = {}
+    for n in grid:
+        candidates = [(table[name, n][1], name) for name in names if table[name, n][2] == "ok"]
+        best[n] = min(candidates)[1] if candidates else None
+    return best
+
+
+def main():
+    tol = float(sys.argv[1]) if len(sys.argv) > 1 else 1e-12
+    time_limit = float(sys.argv[2]) if len(sys.argv) > 2 else 10.0
+    names = sys.argv[3:] or list(BACKENDS)
+
+    table = benchmark(names, GRID, tol, time_limit=time_limit)
+
+    print(f"{'n':<9} {'backend':<16} {'time (ms)':>11} {'evals':>7} {'residual':>10}  status")
+    for n in GRID:
+        for name in names:
+            result, seconds, status = table[name, n]
+            evals = result.evals if result is not None else "-"
+            residual = f"{result.residual:.1e}" if result is not None else "-"
+            print(f"{n:<9} {name:<16} {1e3 * seconds:>11.3f} {evals:>7} {residual:>10}  {status}")
+        print()
+
+    # consecutive n with the same winner form a regime
+    best = choose(table, names, GRID)
+    print(f"fastest backend with residual <= {10 * tol:.0e}:")
+    start = GRID[0]
+    for n, following in zip(GRID, GRID[1:] + [None]):
+        if following is None or best[following] != best[n]:
+            print(f"  n = {start}..{n}: {best[n] or 'none'}")
+            start = following
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Vectorized bracket finder for p(n), with automatic expansion and an mpmath
+polisher.
+
+calc2.f(p) = (1 - n p^n - n p^(n+1) - p^n)^(2^n) - 1/2 changes sign exactly
+where the log-space function of logsolve.py does,
+
+    g(p) = n ln p + ln(1 + n + n p) - L,   L = ln(1 - 2^(-1/2^n))
+
+(with the opposite sign), and g can be evaluated in float64 on a whole numpy
+grid at once without underflow, for any n. So:
+
+  1. g is evaluated on a coarse grid over the search range in one call,
+  2. every sign change on the grid is a bracket; if there is none the range
+     is widened around its centre (clipped to [0, 1]) and scanned again,
+  3. each bracket goes to a bracketing mpmath solver on g at the requested
+     digits.
+
+g is strictly increasing on (0, 1] (g' = n/p + n/(1 + n + n p) > 0), so there
+is exactly one root and a grid holds at most one bracket; solve relies on it.
+
+usage: python bracket.py [digits] [n ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+from mpmath import mp
+
+from adaptive import guard_digits, log_rhs
+from logsolve import log_rhs as log_rhs_float
+
+
+def log_residual(p, n):
+    """
+    g(p) for an array of p in float64
+
+    Args:
+        p: Array of p in [0, 1] (g(0) = -inf)
+        n: The parameter n
+
+    Returns:
+        Array g(p), negative below the root and positive above it
+    """
+    p = np.asarray(p, dtype=float)
+    with np.errstate(divide='ignore'):
+        return n * np.log(p) + np.log1p(n + n * p) - log_rhs_float(n)
+
+
+def sign_changes(xs, values):
+    """
+    Brackets of every sign change of values sampled at xs
+
+    Args:
+        xs: Increasing sample points
+        values: Function values at xs
+
+    Returns:
+        List of (a, b) with a root in [a, b]
+    """
+    s = np.sign(values)
+    idx = np.flatnonzero((s[:-1] * s[1:] < 0) | (s[:-1] == 0))
+    return [(float(xs[i]), float(xs[i + 1])) for i in idx]
+
+
+def find_brackets(n, search_range=(0.0, 1.0), points=65, grow=4.0, max_expansions=20):
+    """
+    Every sign change of g on a grid over search_range, widening it while there is none
+
+    Args:
+        n: The parameter n
+        search_range: Interval to scan first
+        points: Grid points per scan
+        grow: Factor the range is widened by when it holds no sign change
+        max_expansions: Maximum number of widenings
+
+    Returns:
+        (brackets, evals): list of (a, b) (empty if none was found) and the
+        number of grid points evaluated
+    """
+    lo, hi = search_range
+    evals = 0
+    for _ in range(max_expansions + 1):
+        xs = np.linspace(lo, hi, points)
+        brackets = sign_changes(xs, log_residual(xs, n))
+        evals += points
+        if brackets or (lo <= 0.0 and hi >= 1.0):
+            return brackets, evals
+        centre, half = (lo + hi) / 2, grow * (hi - lo) / 2
+        lo, hi = max(centre - half, 0.0), min(centre + half, 1.0)
+    return [], evals
+
+
+def polish(n, a, b, dps=50):
+    """
+    High-precision root of g in the bracket [a, b]
+
+    Args:
+        n: The parameter n
+        a, b: Bracket with a sign change of g
+        dps: Decimal digits wanted
+
+    Returns:
+        (p, evals): p as an mpf and the evaluations of g in mpmath
+    """
+    evals = 0
+
+    def g(p):
+        nonlocal evals
+        evals += 1
+        return n * mp.log(p) + mp.log1p(n + n * p) - L
+
+    with mp.workdps(dps + guard_digits(n)):
+        L = log_rhs(n)
+        root = mp.findroot(g, (mp.mpf(a), mp.mpf(b)), solver='anderson')
+    with mp.workdps(dps):
+        return +root, evals
+
+
+def solve(n, dps=50, search_range=(0.0, 1.0), points=65):
+    """
+    p(n) from the bracket on the grid (g is monotonic, so there is only one),
+    polished to dps digits
+
+    Args:
+        n: The parameter n
+        dps: Decimal digits wanted
+        search_range: Interval to scan first (widened automatically)
+        points: Grid points per scan
+
+    Returns:
+        (p, evals): p (None if there is no sign change) and the grid plus
+        mpmath evaluations
+    """
+    brackets, evals = find_brackets(n, search_range, points)
+    if not brackets:
+        return None, evals
+    assert len(brackets) == 1, f"g is monotonic but has {len(brackets)} sign changes at n = {n}"
+    p, polish_evals = polish(n, *brackets[0], dps)
+    return p, evals + polish_evals
+
+
+def main():
+    dps = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    ns = [int(float(a)) for a in sys.argv[2:]] or [1, 10, 80, 100, 1000, 10**6, 10**9]
+
+    print(f"{'n':<12} {'p':<{dps + 4}} {'evals':<7} {'time (ms)':<10}")
+    for n in ns:
+        start = time.perf_counter()
+        p, evals = solve(n, dps)
+        elapsed = time.perf_counter() - start
+        print(f"{n:<12} {mp.nstr(p, dps):<{dps + 4}} {evals:<7} {1e3 * elapsed:<10.2f}")
+
+    # calc2.py's search range, which does not contain p(80): widened automatically
+    brackets, evals = find_brackets(80, (0.91, 0.94))
+    print(f"n = 80 from (0.91, 0.94): brackets {brackets} after {evals} grid points")
+
+
+if __name__ == "__main__":
+    main()
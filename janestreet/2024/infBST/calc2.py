@@ -1,33 +1,95 @@
-
 import mpmath as mp
 from scipy.optimize import brentq
 
-mp.dps = 100
-
-def f(p_float, n):
-    p = mp.mpf(p_float)
-    base = 1 - n * p**n - n * p**(n+1) - p**n
-    return float(base**(2**n) - mp.mpf(0.5))
-
-n = 80
-
-# Try values around your heuristic p ~ 0.929248
-search_range = (0.91, 0.94)
-step = 0.0005
-
-# Scan for a sign change
-a, b = None, None
-x = search_range[0]
-while x < search_range[1]:
-    f1 = f(x, n)
-    f2 = f(x + step, n)
-    if f1 * f2 < 0:
-        a, b = x, x + step
-        break
-    x += step
-
-if a is not None and b is not None:
-    root = brentq(f, a, b, args=(n,))
-    print(f"Estimated p for n={n} is about: {root}")
-else:
-    print("Couldn't find a sign change in the given interval.")
+import bracket
+
+
+def f(p_float, n, dps=100):
+    """
+    (1 - n p^n - n p^(n+1) - p^n)^(2^n) - 1/2 evaluated with mpmath
+
+    Args:
+        p_float: The value of p
+        n: The parameter n
+        dps: Decimal digits of precision
+
+    Returns:
+        The value as a float
+    """
+    with mp.workdps(dps):
+        p = mp.mpf(p_float)
+        base = 1 - n * p**n - n * p**(n+1) - p**n
+        return float(base**(2**n) - mp.mpf(0.5))
+
+
+def find_bracket(n, search_range=(0.91, 0.94), step=0.0005):
+    """
+    First sign change of f on a grid over search_range, found in one float64
+    batch by bracket.find_brackets (widening the range if it holds none).
+    The grid bracket is a sign change of bracket.g; it is only returned if f
+    also changes sign across it, which fails once base**(2**n) saturates at
+    dps digits (n around 350 and above at the default 100).
+
+    Args:
+        n: The parameter n
+        search_range: Interval to scan first
+        step: Grid spacing
+
+    Returns:
+        (a, b, evals) with f(a) f(b) < 0, or (None, None, evals) if there is none
+    """
+    points = int(round((search_range[1] - search_range[0]) / step)) + 1
+    brackets, evals = bracket.find_brackets(n, search_range, points)
+    if not brackets:
+        return None, None, evals
+    a, b = brackets[0]
+    if not f(a, n) * f(b, n) < 0:
+        return None, None, evals + 2
+    return a, b, evals + 2
+
+
+def compute_p_brentq(n, search_range=(0.91, 0.94), step=0.0005, xtol=2e-12, full_output=False):
+    """
+    Compute p for a given n with brentq on the first sign change of f
+
+    Args:
+        n: The parameter n in the equation
+        search_range: Interval scanned for a sign change
+        step: Scan step
+        xtol: brentq's absolute tolerance
+        full_output: Also return the number of evaluations of f
+
+    Returns:
+        p (None if f has no sign change it can resolve, see find_bracket),
+        or (p, evals) with full_output
+    """
+    a, b, evals = find_bracket(n, search_range, step)
+    root = None
+    if a is not None:
+        root, r = brentq(f, a, b, args=(n,), xtol=xtol, full_output=True)
+        evals += r.function_calls
+    return (root, evals) if full_output else root
+
+
+def main():
+    n = 80
+
+    # Try values around your heuristic p ~ 0.929248
+    root = compute_p_brentq(n, search_range=(0.91, 0.94), step=0.0005)
+
+    if root is not None:
+        print(f"Estimated p for n={n} is about: {root}")
+        p, _ = bracket.solve(n, 50, search_range=(0.91, 0.94))
+        print(f"Polished to 50 digits: {mp.nstr(p, 50)}")
+    else:
+        print("Couldn't find a sign change in the given interval.")
+
+    # f saturates at 100 digits for large n: no bracket rather than a brentq error
+    n = 500
+    root = compute_p_brentq(n, search_range=(0.0, 1.0), step=0.001)
+    p, _ = bracket.solve(n, 50)
+    print(f"n={n}: brentq on f gives {root}, bracket.solve gives {mp.nstr(p, 20)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -76,15 +76,17 @@ def compute_p_newton(n, max_iterations=100, tolerance=1e-10, initial_guess=0.5):
     print(f"Warning: Newton's method did not converge after {max_iterations} iterations")
     return p_current, max_iterations
 
-def compute_p_scipy(n):
+def compute_p_scipy(n, xtol=1.49012e-08, full_output=False):
     """
     Compute p for a given n using SciPy's fsolve
     
     Args:
         n: The parameter n in the equation
+        xtol: fsolve's relative tolerance
+        full_output: Also return the number of function evaluations
     
     Returns:
-        Computed value of p
+        Computed value of p, or (p, evals) with full_output
     """
     # Define K
     K = (1/2)**(1/(2**n))
@@ -94,8 +96,8 @@ def compute_p_scipy(n):
         return (1 - n*(p**n) - n*p**(n+1) - p**n) - K
     
     # Use SciPy's fsolve with initial guess of 0.5
-    result = fsolve(f, 0.5)
-    return result[0]
+    result, info, _, _ = fsolve(f, 0.5, xtol=xtol, full_output=True)
+    return (result[0], info["nfev"]) if full_output else result[0]
 
 def verify_solution(n, p):
     """
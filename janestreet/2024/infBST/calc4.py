@@ -7,7 +7,7 @@ import warnings
 # Set precision for mpmath
 mp.dps = 50  # 50 digits of precision
 
-def compute_p_scipy_stable(n, initial_guess=0.5):
+def compute_p_scipy_stable(n, initial_guess=0.5, xtol=1.49012e-08, full_output=False):
     """
     Compute p for a given n using SciPy's fsolve with log-transformed equations
     for numerical stability with large n values
@@ -15,9 +15,11 @@ def compute_p_scipy_stable(n, initial_guess=0.5):
     Args:
         n: The parameter n in the equation
         initial_guess: Initial guess for p
+        xtol: fsolve's relative tolerance
+        full_output: Also return the number of function evaluations
     
     Returns:
-        Computed value of p
+        Computed value of p, or (p, evals) with full_output
     """
     # For large n, we need to be careful with how we compute K = (1/2)^(1/2^n)
     # For large n, 1/2^n becomes very small, and K approaches 1
@@ -46,11 +48,11 @@ def compute_p_scipy_stable(n, initial_guess=0.5):
     # Use SciPy's fsolve
     with warnings.catch_warnings():
         warnings.simplefilter("ignore")
-        result = fsolve(f, initial_guess)
+        result, info, _, _ = fsolve(f, initial_guess, xtol=xtol, full_output=True)
     
-    return result[0]
+    return (result[0], info["nfev"]) if full_output else result[0]
 
-def compute_p_mpmath(n, initial_guess=0.5, max_iterations=100, tolerance=1e-20):
+def compute_p_mpmath(n, initial_guess=0.5, max_iterations=100, tolerance=1e-20, full_output=False):
     """
     Compute p for a given n using mpmath for arbitrary precision
     
@@ -59,9 +61,10 @@ def compute_p_mpmath(n, initial_guess=0.5, max_iterations=100, tolerance=1e-20):
         initial_guess: Initial guess for p
         max_iterations: Maximum number of iterations
         tolerance: Convergence tolerance
+        full_output: Also return the number of Newton iterations
     
     Returns:
-        Computed value of p
+        Computed value of p, or (p, iterations) with full_output
     """
     n = mpf(n)
     p = mpf(initial_guess)
@@ -70,7 +73,8 @@ def compute_p_mpmath(n, initial_guess=0.5, max_iterations=100, tolerance=1e-20):
     if n > 100:
         # For large n, p approaches (log(2)/n)^(1/n)
         # This is because as n gets very large, the equation simplifies
-        return float(power(mp.log(2)/n, 1/n))
+        p = float(power(mp.log(2)/n, 1/n))
+        return (p, 0) if full_output else p
     
     # For more moderate n, use Newton's method with mpmath
     for i in range(max_iterations):
@@ -86,13 +90,13 @@ def compute_p_mpmath(n, initial_guess=0.5, max_iterations=100, tolerance=1e-20):
         
         # Check convergence
         if abs(p_next - p) < tolerance:
-            return float(p_next)
+            return (float(p_next), i + 1) if full_output else float(p_next)
         
         p = p_next
     
     # If didn't converge
     print(f"Warning: Newton's method with mpmath did not converge after {max_iterations} iterations")
-    return float(p)
+    return (float(p), max_iterations) if full_output else float(p)
 
 def get_asymptotic_approximation(n):
     """
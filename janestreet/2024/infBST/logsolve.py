@@ -0,0 +1,126 @@
+"""
+Vectorized log-space Newton solver for p(n), for a whole array of n at once.
+
+(1 - n p^n - n p^(n+1) - p^n)^(2^n) = 1/2 is p^n (1 + n + n p) = 1 - K with
+K = 2^(-1/2^n). Both sides underflow for large n, so with y = ln p and
+x = ln2 / 2^n solve
+
+    F(y) = n y + ln(1 + n + n e^y) - L = 0,   L = ln(-expm1(-x))
+
+where L = ln ln2 - n ln2 + ln(-expm1(-x) / x) never underflows. F' lies in
+(n, n + 1) and F is convex, so Newton converges from anywhere in a handful
+of steps.
+"""
+
+import sys
+import time
+
+import numpy as np
+from mpmath import mp, mpf
+
+LN2 = np.log(2.0)
+
+
+def log_rhs(n):
+    """
+    ln(1 - 2^(-1/2^n)) for an array of n, without underflow
+
+    Args:
+        n: Array of n (>= 1)
+
+    Returns:
+        Array L with L = ln(1 - K)
+    """
+    n = np.asarray(n, dtype=float)
+    x = np.ldexp(LN2, -np.minimum(n, 2000).astype(np.int64))
+    # ln(-expm1(-x) / x) = -x/2 + O(x^2), 0 once x underflows
+    with np.errstate(divide='ignore', invalid='ignore'):
+        correction = np.where(x > 0, np.log(-np.expm1(-x) / x), 0.0)
+    return np.log(LN2) - n * LN2 + correction
+
+
+def initial_guess(n, L):
+    """
+    Starting point for Newton in y = ln p
+
+    Args:
+        n: Array of n
+        L: log_rhs(n)
+
+    Returns:
+        y0 = (L - ln(1 + 3n/2)) / n, i.e. the solution with p = 1/2 inside the log
+    """
+    return (L - np.log1p(1.5 * n)) / n
+
+
+def solve_log_p(n, tolerance=1e-15, max_iterations=50):
+    """
+    Solve for p for every n of an array at once with Newton's method in y = ln p
+
+    Args:
+        n: Array (or scalar) of n >= 1
+        tolerance: Stop once every |Newton step| in y is below this
+        max_iterations: Maximum number of iterations
+
+    Returns:
+        (p, y, residual, iterations): p = exp(y), residual = F(y) per n and
+        the number of iterations taken
+    """
+    n = np.asarray(n, dtype=float)
+    L = log_rhs(n)
+    y = initial_guess(n, L)
+    log1n = np.log1p(n)
+
+    for i in range(max_iterations):
+        # ln(1 + n + n e^y) = ln(1 + n) + log1p(n e^y / (1 + n))
+        t = n * np.exp(y) / (1 + n)
+        F = n * y + log1n + np.log1p(t) - L
+        step = F / (n + t / (1 + t))
+        y = y - step
+        if np.max(np.abs(step), initial=0.0) < tolerance:
+            break
+
+    t = n * np.exp(y) / (1 + n)
+    residual = n * y + log1n + np.log1p(t) - L
+    return np.exp(y), y, residual, i + 1
+
+
+def solve_log_p_mpmath(n, dps=50):
+    """
+    Reference solution of the same log-space equation with mpmath
+
+    Args:
+        n: The parameter n
+        dps: Decimal digits of precision
+
+    Returns:
+        p as an mpf
+    """
+    with mp.workdps(dps):
+        n = mpf(int(n))
+        x = mp.ln2 / mp.power(2, n)
+        L = mp.log(-mp.expm1(-x))
+        y = mp.findroot(lambda y: n * y + mp.log(1 + n + n * mp.exp(y)) - L, (L - mp.log(1 + 1.5 * n)) / n)
+        return mp.exp(y)
+
+
+def main():
+    max_n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+    n = np.arange(1, max_n + 1)
+
+    start = time.perf_counter()
+    p, _, residual, iterations = solve_log_p(n)
+    elapsed = time.perf_counter() - start
+    print(f"p(n) for n = 1..{max_n} in {elapsed:.2f} seconds, {iterations} Newton iterations, "
+          f"max |F| = {np.max(np.abs(residual)):.2e}")
+
+    print(f"{'n':<10} {'p (vectorized)':<22} {'p (mpmath)':<22} {'relative error':<15}")
+    for k in [1, 2, 3, 10, 100, 1000, 10**4, 10**5, 10**6]:
+        if k > max_n:
+            break
+        exact = solve_log_p_mpmath(k)
+        print(f"{k:<10} {p[k - 1]:<22.17f} {mp.nstr(exact, 17):<22} {float(abs(p[k - 1] - exact) / exact):<15.2e}")
+
+
+if __name__ == "__main__":
+    main()
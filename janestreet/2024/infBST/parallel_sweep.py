@@ -0,0 +1,182 @@
+"""
+Parallel sweep of certified p(n) over a range of n.
+
+The n not yet in the store (store.py) are solved on a process pool; every
+worker process has its own mpmath context, so precision settings never leak
+between them. Results come back in order of n and each one is appended to the
+store's CSV as soon as it arrives, so an interrupted sweep loses at most the
+rows still in flight: running it again picks up where it stopped.
+
+Optionally all rows of the range are also streamed, in order of n, to an
+output table as they become available:
+
+  .parquet  - one row group per batch of rows (needs pyarrow),
+  .csv      - anything else.
+
+usage: python parallel_sweep.py [first n] [last n] [digits] [workers] [out file] [store file]
+"""
+
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from store import PStore, compute_entry, entry_from_row, entry_to_row
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+COLUMNS = ["n", "dps", "p", "p_float", "p_lo", "p_hi", "residual", "steps"]
+
+
+def entry_row(entry):
+    """
+    One output row for a store entry
+
+    Args:
+        entry: store.Entry
+
+    Returns:
+        List of values in COLUMNS order, p and its bounds as full-precision strings
+    """
+    n, dps, p, p_lo, p_hi, _, steps = entry_to_row(entry)
+    return [n, dps, p, float(entry.p), p_lo, p_hi, float(entry.residual), steps]
+
+
+class RowWriter:
+    """
+    Writes rows to a .parquet or .csv table in batches. Use as a context
+    manager, or call close() to write the last batch.
+    """
+
+    def __init__(self, path, batch=1024):
+        self.path = path
+        self.batch = batch
+        self.rows = 0
+        self._buffer = []
+        if path.endswith(".parquet"):
+            if pyarrow is None:
+                raise ImportError("writing .parquet tables needs pyarrow, use a .csv file instead")
+            types = [pyarrow.int64(), pyarrow.int32(), pyarrow.string(), pyarrow.float64(),
+                     pyarrow.string(), pyarrow.string(), pyarrow.float64(), pyarrow.int32()]
+            self._schema = pyarrow.schema(list(zip(COLUMNS, types)))
+            self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+            self._file = None
+        else:
+            self._writer = None
+            self._file = open(path, "w", newline="")
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(COLUMNS)
+
+    def write(self, row):
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if self._writer is not None:
+            columns = list(zip(*self._buffer))
+            self._writer.write_table(pyarrow.Table.from_arrays(
+                [pyarrow.array(c, type=f.type) for c, f in zip(columns, self._schema)], schema=self._schema))
+        else:
+            self._csv.writerows(self._buffer)
+            self._file.flush()
+        self.rows += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def solve_one(n, dps):
+    """
+    Worker: certified entry for one n (float64 start, see store.warm_start),
+    as a row of strings: unpickling an mpf rounds it to the receiver's precision.
+    """
+    return entry_to_row(compute_entry(n, dps))
+
+
+def sweep(ns, dps=50, store=None, workers=None, out=None, chunksize=16):
+    """
+    Certified p for every n of ns, solving the missing ones in parallel
+
+    Args:
+        ns: Iterable of n; results are produced in this order
+        dps: Decimal digits wanted
+        store: PStore results are read from and appended to (default: p_store.csv)
+        workers: Number of worker processes (default: all cores, 0 = in process)
+        out: Optional output table path (.parquet or .csv) for every row of ns
+        chunksize: n sent to a worker at a time
+
+    Returns:
+        (solved, cached): how many n were computed and how many came from the store
+    """
+    ns = [int(n) for n in ns]
+    store = PStore() if store is None else store
+    workers = os.cpu_count() if workers is None else workers
+    pending = [n for n in ns if store.get(n, dps) is None]
+
+    pool = ProcessPoolExecutor(workers) if workers > 0 else None
+    writer = RowWriter(out) if out is not None else None
+    try:
+        if pool is not None:
+            results = pool.map(solve_one, pending, [dps] * len(pending), chunksize=chunksize)
+        else:
+            results = map(solve_one, pending, [dps] * len(pending))
+        missing = set(pending)
+        for n in ns:
+            if n in missing:
+                # results arrive in order of pending, which is the order of ns
+                entry = entry_from_row(next(results))
+                store.put(entry)
+                missing.discard(n)
+            else:
+                entry = store.get(n, dps)
+            if writer is not None:
+                writer.write(entry_row(entry))
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    return len(pending), len(ns) - len(pending)
+
+
+def main():
+    first = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1
+    last = int(float(sys.argv[2])) if len(sys.argv) > 2 else 10000
+    dps = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    workers = int(sys.argv[4]) if len(sys.argv) > 4 else os.cpu_count()
+    out = sys.argv[5] if len(sys.argv) > 5 else None
+    path = sys.argv[6] if len(sys.argv) > 6 else "p_store.csv"
+
+    start = time.perf_counter()
+    solved, cached = sweep(range(first, last + 1), dps, PStore(path), workers, out)
+    elapsed = time.perf_counter() - start
+    print(f"n = {first}..{last} at {dps} digits with {workers} workers: {solved} solved, "
+          f"{cached} from {path}, {elapsed:.2f} seconds")
+    if out is not None:
+        print(f"rows written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Persistent store of certified p(n), keyed by (n, digits).
+
+Every solved (n, dps) is appended as one CSV row (n, dps, p, p_lo, p_hi,
+residual, steps) with p and its certified bounds written at full precision,
+so a run never recomputes anything an earlier run stored. On open the whole
+file is read into a dict: lookups are O(1) and an entry stored at more digits
+also answers requests for fewer.
+
+Missing n are solved with a warm start from the nearest stored neighbour:
+y = ln p is moved along the tangent dy/dn = -F_n / F_y of the log-space
+equation from logsolve.py, which is good to ~3 log10(n) - log10(ln n) digits
+for |dn| = 1, and adaptive.newton doubles the precision from there. That beats
+the 15 digits of the float64 start only for n beyond ~10^5 (at n = 10^9 a
+50-digit solve takes one Newton step); below, the float start is used.
+
+usage: python store.py [first n] [last n] [digits] [store file]
+"""
+
+import collections
+import csv
+import os
+import sys
+import time
+
+from mpmath import mp
+
+from adaptive import guard_digits, log_rhs, residual, solve
+
+Entry = collections.namedtuple("Entry", ["n", "dps", "p", "p_lo", "p_hi", "residual", "steps"])
+
+FIELDS = list(Entry._fields)
+
+
+def tangent(n, y, n_new):
+    """
+    First-order estimate of y(n_new) from the solution y at n
+
+    Args:
+        n: The parameter n of the known solution
+        y: ln p(n) as an mpf
+        n_new: The parameter n to extrapolate to
+
+    Returns:
+        y + (n_new - n) dy/dn
+    """
+    x = mp.ln2 * mp.power(2, -n)
+    e = mp.exp(y)
+    F_y = n + n * e / (1 + n + n * e)
+    # dL/dn = -ln2 x / expm1(x)
+    F_n = y + (1 + e) / (1 + n + n * e) + mp.ln2 * x / mp.expm1(x)
+    return y - (n_new - n) * F_n / F_y
+
+
+def compute_entry(n, dps=50, y0=None, start_digits=15):
+    """
+    Solve and certify p(n) and package it as a store entry
+
+    Args:
+        n: The parameter n
+        dps: Decimal digits wanted
+        y0: Optional starting ln p
+        start_digits: Digits y0 is good to
+
+    Returns:
+        The Entry for n
+    """
+    cert = solve(n, dps, y0, start_digits)
+    with mp.workdps(cert.dps + guard_digits(n)):
+        r = residual(mp.log(cert.p), n, log_rhs(n))
+    return Entry(n, cert.dps, cert.p, cert.p_bounds[0], cert.p_bounds[1], r, cert.steps)
+
+
+def entry_to_row(entry):
+    """
+    CSV row for an entry, p and its bounds as strings at full precision
+
+    Args:
+        entry: Entry
+
+    Returns:
+        List of values in FIELDS order
+    """
+    digits = entry.dps + guard_digits(entry.n)
+    return ([entry.n, entry.dps] + [mp.nstr(v, digits, strip_zeros=False) for v in (entry.p, entry.p_lo, entry.p_hi)]
+            + [mp.nstr(entry.residual, 5), entry.steps])
+
+
+def entry_from_row(row):
+    """
+    Entry from a CSV row (strings in FIELDS order), read at the precision it was stored with
+
+    Args:
+        row: Sequence of values in FIELDS order
+
+    Returns:
+        Entry
+    """
+    n, dps = int(row[0]), int(row[1])
+    with mp.workdps(dps + guard_digits(n)):
+        return Entry(n, dps, mp.mpf(row[2]), mp.mpf(row[3]), mp.mpf(row[4]), mp.mpf(row[5]), int(row[6]))
+
+
+class PStore:
+    """
+    Append-only CSV cache of certified p(n). Use solve(n, dps) or
+    solve_range(ns, dps); both only compute what is missing.
+    """
+
+    def __init__(self, path="p_store.csv"):
+        self.path = path
+        self.entries = {}
+        self.best = {}
+        self.hits = 0
+        self.misses = 0
+        if os.path.exists(path):
+            self._repair()
+            with open(path, newline="") as f:
+                rows = csv.reader(f)
+                next(rows, None)
+                for row in rows:
+                    self._index(entry_from_row(row))
+
+    def _repair(self):
+        """Drop a last row cut off by an interrupted write."""
+        with open(self.path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b"\n":
+                return
+            # scan back in chunks: a row at high dps can be longer than one chunk
+            end = size
+            while end > 0:
+                start = max(0, end - 4096)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                end = start
+            f.truncate(0)
+
+    def _index(self, entry):
+        self.entries[entry.n, entry.dps] = entry
+        if entry.dps > self.best.get(entry.n, 0):
+            self.best[entry.n] = entry.dps
+
+    def get(self, n, dps):
+        """
+        Stored entry for n at dps or more digits
+
+        Args:
+            n: The parameter n
+            dps: Decimal digits wanted
+
+        Returns:
+            An Entry, or None if n was never solved to dps digits
+        """
+        entry = self.entries.get((n, dps))
+        if entry is None and self.best.get(n, 0) >= dps:
+            entry = self.entries[n, self.best[n]]
+        return entry
+
+    def put(self, entry):
+        """Add an entry and append it to the file."""
+        new = not os.path.exists(self.path)
+        with open(self.path, "a", newline="") as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(FIELDS)
+            writer.writerow(entry_to_row(entry))
+        self._index(entry)
+
+    def warm_start(self, n, dps, reach=8):
+        """
+        Starting ln p for n from the nearest stored neighbour within reach
+
+        Args:
+            n: The parameter n
+            dps: Decimal digits wanted (neighbours need at least as many)
+            reach: Largest |n - neighbour| to use
+
+        Returns:
+            (y0, digits) for adaptive.newton, or (None, 15) (the float64 start)
+            without a neighbour that would do better
+        """
+        for dn in range(1, reach + 1):
+            # the tangent misses by about dn^2 y'' / 2 ~ dn^2 ln(n) / n^3
+            size = max(n - dn, 2)
+            digits = int(3 * mp.log10(size) - 2 * mp.log10(dn) - mp.log10(mp.log(size)))
+            if digits <= 15:
+                break
+            for m in (n - dn, n + dn):
+                entry = self.get(m, dps)
+                if entry is not None:
+                    with mp.workdps(dps + guard_digits(n)):
+                        return tangent(m, mp.log(entry.p), n), digits
+        return None, 15
+
+    def solve(self, n, dps=50):
+        """
+        Certified p(n) to dps digits, from the store if possible
+
+        Args:
+            n: The parameter n
+            dps: Decimal digits wanted
+
+        Returns:
+            The Entry for n
+        """
+        entry = self.get(n, dps)
+        if entry is not None:
+            self.hits += 1
+            return entry
+        self.misses += 1
+        y0, digits = self.warm_start(n, dps)
+        entry = compute_entry(n, dps, y0, digits)
+        self.put(entry)
+        return entry
+
+    def solve_range(self, ns, dps=50):
+        """
+        Certified p for every n of ns, solving only the ones not stored yet
+
+        Args:
+            ns: Iterable of n
+            dps: Decimal digits wanted
+
+        Returns:
+            List of Entry in the order of ns
+        """
+        return [self.solve(int(n), dps) for n in ns]
+
+
+def main():
+    first = int(float(sys.argv[1])) if len(sys.argv) > 1 else 1
+    last = int(float(sys.argv[2])) if len(sys.argv) > 2 else 1000
+    dps = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    path = sys.argv[4] if len(sys.argv) > 4 else "p_store.csv"
+
+    store = PStore(path)
+    print(f"{path}: {len(store.entries)} entries")
+    for attempt in ("first", "repeat"):
+        hits, misses, known = store.hits, store.misses, set(store.entries)
+        start = time.perf_counter()
+        entries = store.solve_range(range(first, last + 1), dps)
+        elapsed = time.perf_counter() - start
+        steps = collections.Counter(e.steps for e in entries if (e.n, e.dps) not in known)
+        print(f"{attempt} sweep n = {first}..{last} at {dps} digits: {elapsed:.3f} seconds, "
+              f"{store.hits - hits} cached, {store.misses - misses} solved, Newton steps {dict(sorted(steps.items()))}")
+
+    e = entries[-1]
+    print(f"p({e.n}) = {mp.nstr(e.p, dps)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+import calc2
+
+
+def test_brentq_returns_none_where_f_saturates():
+    # bracket.find_brackets still brackets p(500) on g, but f is 0.5 at both ends
+    assert calc2.compute_p_brentq(500, search_range=(0.0, 1.0), step=0.001) is None
+
+
+def test_brentq_root_where_f_resolves_it():
+    p = calc2.compute_p_brentq(80, search_range=(0.0, 1.0), step=0.001)
+    assert abs(p - 0.46887640654706186) < 1e-11
@@ -0,0 +1,16 @@
+import os
+
+from store import PStore
+
+
+def test_repair_drops_cut_off_row_longer_than_a_chunk(tmp_path):
+    # at 3000 digits a row is ~9 KiB, more than the 4 KiB _repair reads at a time
+    path = str(tmp_path / "p_store.csv")
+    store = PStore(path)
+    store.solve(5, 3000)
+    store.solve(6, 3000)
+    size = os.path.getsize(path)
+    with open(path, "rb+") as f:
+        f.truncate(size - size // 4)
+
+    assert sorted(PStore(path).entries) == [(5, 3000)]
@@ -0,0 +1,126 @@
+"""
+Common-random-numbers optimizer for d.
+
+objective() in naive.py draws fresh games on every call, so minimize_scalar
+optimizes noise. Here every candidate d is played on the same games (a
+Simulator replaying one seed), so the win rate is a deterministic function of d
+and differences between two d values only come from the games where they
+disagree. Each round:
+
+  1. scores a grid of d over the current bracket on n games,
+  2. replays the same games pairing every d with the best one: per game the
+     difference of outcomes is -1, 0 or 1, which gives a standard error for
+     win(d) - win(best) far smaller than two independent estimates would,
+  3. keeps the d values not significantly worse than the best as the next
+     bracket (a confidence interval for the optimal d), and quadruples n
+     whenever the bracket can no longer shrink at the current n.
+
+usage: python crn.py [budget games] [seed]
+"""
+import collections
+import math
+import sys
+import time
+
+import numpy as np
+
+from engine import Simulator
+
+Optimum = collections.namedtuple("Optimum", ["d", "winrate", "ci", "n", "games", "rounds"])
+
+
+def paired_counts(ds, ref: float, n: int, seed: int = 0, block: int = 1 << 14):
+    """
+    Replay n games from seed and count, for every d in ds, Spears wins and the
+    games d wins but ref loses (plus) or ref wins but d loses (minus).
+    """
+    ds = np.atleast_1d(np.asarray(ds, dtype=float))
+    sim = Simulator(seed, block)
+    wins = np.zeros(len(ds), dtype=np.int64)
+    plus = np.zeros(len(ds), dtype=np.int64)
+    minus = np.zeros(len(ds), dtype=np.int64)
+    masks = np.empty((sim.d_chunk, block), dtype=bool)
+    ref_mask = np.empty((1, block), dtype=bool)
+    differ = np.empty(block, dtype=bool)
+
+    done = 0
+    while done < n:
+        m = min(block, n - done)
+        sim.draw(m)
+        won_ref = sim.win_masks([ref], m, ref_mask)[0]
+        for lo in range(0, len(ds), sim.d_chunk):
+            won = sim.win_masks(ds[lo:lo + sim.d_chunk], m, masks)
+            for i in range(len(won)):
+                wins[lo + i] += np.count_nonzero(won[i])
+                np.greater(won[i], won_ref, out=differ[:m])
+                plus[lo + i] += np.count_nonzero(differ[:m])
+                np.less(won[i], won_ref, out=differ[:m])
+                minus[lo + i] += np.count_nonzero(differ[:m])
+        done += m
+    return wins, plus, minus
+
+
+def maximize_crn(lo: float = 0.0, hi: float = 0.5, budget: int = 2 * 10**8, n0: int = 1 << 17,
+                 grid: int = 33, z: float = 1.96, seed: int = 0, tol: float = 1e-9):
+    """
+    Maximize Spears' win rate over d in [lo, hi] with common random numbers,
+    using at most budget simulated games.
+
+    Returns an Optimum(d, winrate, ci, n, games, rounds): ci is the range of d
+    whose win rate is within z paired standard errors of the best on the last
+    round's n games, games the total simulated. Same arguments, same answer.
+    """
+    block = Simulator(seed).block
+    n = max(block, n0 - n0 % block)
+    games = 0
+    rounds = 0
+    best_d, best_rate, ci, used = lo, 0.0, (lo, hi), 0
+
+    while True:
+        ds = np.linspace(lo, hi, grid)
+        # one pass to find the best d, one to pair everything with it
+        if games + 2 * n > budget:
+            break
+        wins, _ = Simulator(seed, block).simulate(ds, n)
+        best = int(np.argmax(wins))
+        wins, plus, minus = paired_counts(ds, ds[best], n, seed, block)
+        games += 2 * n
+        rounds += 1
+
+        mean = (plus - minus) / n
+        var = (plus + minus) / n - mean**2
+        upper = mean + z * np.sqrt(var / n)
+        keep = np.flatnonzero(upper >= 0)
+        best_d, best_rate, used = float(ds[best]), wins[best] / n, n
+        ci = (float(ds[keep[0]]), float(ds[keep[-1]]))
+
+        step = (hi - lo) / (grid - 1)
+        new_lo = max(lo, ci[0] - step)
+        new_hi = min(hi, ci[1] + step)
+        if new_hi - new_lo > (hi - lo) / 2:
+            # the games can't tell these d apart: more games, same bracket
+            n *= 4
+        lo, hi = new_lo, new_hi
+        if hi - lo < tol:
+            break
+
+    return Optimum(best_d, best_rate, ci, used, games, rounds)
+
+
+def main():
+
+    budget = int(float(sys.argv[1])) if len(sys.argv) > 1 else 2 * 10**8
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+
+    start = time.perf_counter()
+    opt = maximize_crn(budget=budget, seed=seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"{opt.rounds} rounds, {opt.games} games in {elapsed:.2f} seconds, last round n = {opt.n}")
+    print(f"Maximum winrate achieved : {opt.winrate:.10f} +- {1.96 * math.sqrt(opt.winrate * (1 - opt.winrate) / opt.n):.2g}")
+    print(f"Maximally Informative d boundary: {opt.d:.10f}")
+    print(f"95% interval for d: [{opt.ci[0]:.10f}, {opt.ci[1]:.10f}]")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Batched Monte Carlo engine for Java-lin v. Spears.
+
+Same game as trial() in naive.py: Java-lin keeps j1 if j1 > 0.5 else throws j2,
+Spears learns bit = [j1 < d] and picks s1 or s2 by resolveS_mask. Nothing
+after the draws depends on d except which throw Spears keeps:
+
+    select_s2(d) = s1 < d  or  (j1 >= d and r(s1) < d)
+
+so every block of games is drawn once, into preallocated buffers, together
+with the two possible outcomes w1 = [s1 > tj] and w2 = [s2 > tj]. Then for a
+whole chunk of d values at once (broadcast to a (d_chunk, block) array)
+
+    wins(d) = #w1 + #(select_s2 and w2 and not w1) - #(select_s2 and w1 and not w2)
+
+counted with np.count_nonzero.
+
+Results depend on (seed, block): the same pair always gives the same counts.
+"""
+import sys
+import time
+
+import numpy as np
+
+
+class Simulator:
+    """
+    Draws games from a seeded numpy Generator, block games at a time, and
+    counts Spears wins for many d values per block. The seed is anything
+    np.random.default_rng takes: an int, or a SeedSequence (shards.py gives
+    every shard a child of one root sequence).
+    """
+
+    def __init__(self, seed: int | np.random.SeedSequence = 0, block: int = 1 << 14, d_chunk: int = 8):
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.block = block
+        self.d_chunk = d_chunk
+
+        # per game
+        self.j1 = np.empty(block)
+        self.s1 = np.empty(block)
+        self.j2 = np.empty(block)
+        self.s2 = np.empty(block)
+        self.tj = np.empty(block)
+        self.r = np.empty(block)
+        self.w1 = np.empty(block, dtype=bool)
+        self.w2 = np.empty(block, dtype=bool)
+        self.up = np.empty(block, dtype=bool)
+        self.down = np.empty(block, dtype=bool)
+
+        # per (d, game)
+        self.select = np.empty((d_chunk, block), dtype=bool)
+        self.tmp = np.empty((d_chunk, block), dtype=bool)
+        self.tmp2 = np.empty((d_chunk, block), dtype=bool)
+
+    def draw(self, m: int) -> int:
+        """Draw the next m <= block games. Returns #w1, Spears' wins if it never rethrows."""
+        j1, s1, j2, s2 = self.j1[:m], self.s1[:m], self.j2[:m], self.s2[:m]
+        self.rng.random(out=j1)
+        self.rng.random(out=s1)
+        self.rng.random(out=j2)
+        self.rng.random(out=s2)
+
+        # Java-lin keeps its first throw above 0.5
+        tj = self.tj[:m]
+        np.copyto(tj, j2)
+        np.copyto(tj, j1, where=j1 > 0.5)
+
+        # r = (0.5*s1 - 0.25) / (s1 - 0.75), inf at s1 == 0.75 as in resolveS_mask
+        r = self.r[:m]
+        np.subtract(s1, 0.75, out=r)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.divide(0.5 * s1 - 0.25, r, out=r)
+        r[s1 == 0.75] = np.inf
+
+        w1, w2, up, down = self.w1[:m], self.w2[:m], self.up[:m], self.down[:m]
+        np.greater(s1, tj, out=w1)
+        np.greater(s2, tj, out=w2)
+        # rethrowing turns a loss into a win (up) or a win into a loss (down)
+        np.greater(w2, w1, out=up)
+        np.greater(w1, w2, out=down)
+        return np.count_nonzero(w1)
+
+    def count_block(self, ds: np.ndarray, m: int, base: int, wins: np.ndarray, info: np.ndarray):
+        """Add the current block's Spears wins and information bits for every d to wins and info."""
+        j1, s1, r, up, down = self.j1[:m], self.s1[:m], self.r[:m], self.up[:m], self.down[:m]
+        for lo in range(0, len(ds), self.d_chunk):
+            d = ds[lo:lo + self.d_chunk, None]
+            k = len(d)
+            select, tmp, tmp2 = self.select[:k, :m], self.tmp[:k, :m], self.tmp2[:k, :m]
+
+            np.less(s1, d, out=select)
+            np.greater_equal(j1, d, out=tmp)
+            for i in range(k):
+                info[lo + i] += m - np.count_nonzero(tmp[i])
+            np.less(r, d, out=tmp2)
+            tmp &= tmp2
+            select |= tmp
+
+            np.logical_and(select, up, out=tmp)
+            np.logical_and(select, down, out=tmp2)
+            for i in range(k):
+                wins[lo + i] += base + np.count_nonzero(tmp[i]) - np.count_nonzero(tmp2[i])
+
+    def win_masks(self, ds: np.ndarray, m: int, out: np.ndarray) -> np.ndarray:
+        """
+        Spears' win / loss in each of the current block's m games for up to
+        d_chunk values of d, written to out[:len(ds), :m].
+        """
+        j1, s1, r, w1, up, down = self.j1[:m], self.s1[:m], self.r[:m], self.w1[:m], self.up[:m], self.down[:m]
+        d = np.asarray(ds, dtype=float).reshape(-1, 1)
+        k = len(d)
+        select, tmp, tmp2 = self.select[:k, :m], self.tmp[:k, :m], self.tmp2[:k, :m]
+        out = out[:k, :m]
+
+        np.less(s1, d, out=select)
+        np.greater_equal(j1, d, out=tmp)
+        np.less(r, d, out=tmp2)
+        tmp &= tmp2
+        select |= tmp
+
+        # won without rethrowing and not lost by it, or won by rethrowing
+        np.logical_and(select, down, out=tmp2)
+        np.greater(w1, tmp2, out=out)
+        np.logical_and(select, up, out=tmp)
+        out |= tmp
+        return out
+
+    def simulate(self, ds, n: int):
+        """
+        Play n games (continuing this simulator's random stream) and return
+        integer arrays (wins, info): Spears wins and [j1 < d] counts per d.
+        """
+        ds = np.atleast_1d(np.asarray(ds, dtype=float))
+        wins = np.zeros(len(ds), dtype=np.int64)
+        info = np.zeros(len(ds), dtype=np.int64)
+        done = 0
+        while done < n:
+            m = min(self.block, n - done)
+            base = self.draw(m)
+            self.count_block(ds, m, base, wins, info)
+            done += m
+        return wins, info
+
+    def win_rate(self, ds, n: int):
+        """(winrate, information gained) per d over n fresh games, like trial()."""
+        wins, info = self.simulate(ds, n)
+        return wins / n, info / n
+
+
+def win_rate(ds, n: int, seed: int = 0):
+    """Win rates for every d in ds on the same n games drawn from seed."""
+    return Simulator(seed).win_rate(ds, n)
+
+
+def main():
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10**7
+    num_d = int(sys.argv[2]) if len(sys.argv) > 2 else 64
+    ds = np.linspace(0.0, 0.5, num_d)
+
+    # check against naive.py's resolveS_mask on one block
+    from naive import resolveS_mask
+
+    sim = Simulator(seed=1)
+    m = sim.block
+    sim.draw(m)
+    wins, info = np.zeros(len(ds), dtype=np.int64), np.zeros(len(ds), dtype=np.int64)
+    sim.count_block(ds, m, np.count_nonzero(sim.w1[:m]), wins, info)
+    for i, d in enumerate(ds):
+        ts = np.where(resolveS_mask(d, sim.s1, sim.j1 < d), sim.s2, sim.s1)
+        if np.count_nonzero(ts > sim.tj) != wins[i]:
+            print(f"MISMATCH with naive.resolveS_mask at d = {d}")
+            sys.exit(1)
+
+    sim = Simulator(seed=0)
+    start = time.perf_counter()
+    winrate, information = sim.win_rate(ds, n)
+    elapsed = time.perf_counter() - start
+
+    best = np.argmax(winrate)
+    print(f"{n} games x {num_d} d values in {elapsed:.2f} seconds: "
+          f"{n * num_d / elapsed / 1e6:.0f} M games/s")
+    print(f"Maximum winrate achieved : {winrate[best]:.10f}")
+    print(f"Maximally Informative d boundary: {ds[best]:.10f}")
+    print(f"Information gained: {information[best]:.10f}")
+
+
+if __name__ == '__main__':
+    main()
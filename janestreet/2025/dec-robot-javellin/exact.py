@@ -0,0 +1,119 @@
+"""
+Exact win probability of Spears for the game in naive.py.
+
+Java-lin's final throw tj is j1 if j1 > 0.5 else j2, and Spears' bit is
+[j1 < d]. For both values of the bit, H_bit(t) = P(tj <= t, bit) is piecewise
+linear in t with breakpoints 0.5 and d:
+
+    H_1(t) = min(d, 1/2) t + max(0, min(t, d) - 1/2)
+    H_0(t) = max(0, 1/2 - d) t + max(0, t - max(d, 1/2))
+
+Spears keeping s1 = x wins with probability H_bit(x); rethrowing wins with
+K_bit = integral of H_bit over [0, 1]. Which one resolveS_mask picks changes
+only at x = d, at the root c of r(x) = d and at the pole 0.75 of r, so
+
+    P(win) = sum over bit, over the pieces between breakpoints
+             of K_bit * length  or  the exact trapezoid of H_bit.
+
+Arithmetic is generic: pass d as a fractions.Fraction and the result is the
+exact rational probability, pass a float and it takes microseconds.
+
+usage: python exact.py [num_games]
+"""
+import sys
+import time
+from fractions import Fraction
+
+import numpy as np
+
+
+def constants(d):
+    """1/4, 1/2 and 3/4 in d's arithmetic (Fraction stays exact, float stays fast)."""
+    one = d ** 0
+    return one / 4, one / 2, 3 * one / 4
+
+
+def tj_cdf(t, d, bit: bool):
+    """H_bit(t) = P(tj <= t and [j1 < d] == bit)."""
+    _, half, _ = constants(d)
+    if bit:
+        return min(d, half) * t + max(0, min(t, d) - half)
+    return max(0, half - d) * t + max(0, t - max(d, half))
+
+
+def rethrows(x, d, bit: bool) -> bool:
+    """resolveS_mask for a single s1 = x."""
+    if x < d:
+        return True
+    if bit:
+        return False
+    quarter, half, three_quarters = constants(d)
+    den = x - three_quarters
+    return den != 0 and (half * x - quarter) / den < d
+
+
+def breakpoints(d):
+    """Sorted points of [0, 1] where tj_cdf bends or Spears' choice may change."""
+    quarter, half, three_quarters = constants(d)
+    points = {0, 1, half, three_quarters, d}
+    if d != half:
+        # r(x) = d  <=>  x = (1/4 - 3d/4) / (1/2 - d)
+        points.add((quarter - three_quarters * d) / (half - d))
+    return sorted(x for x in points if 0 <= x <= 1)
+
+
+def win_probability(d):
+    """P(Spears wins) for information cutoff d in [0, 1]."""
+    points = breakpoints(d)
+    pieces = list(zip(points, points[1:]))
+    total = 0
+    for bit in (True, False):
+        # H_bit is linear on every piece, so trapezoids are exact
+        areas = [(b - a) * (tj_cdf(a, d, bit) + tj_cdf(b, d, bit)) / 2 for a, b in pieces]
+        rethrow_win = sum(areas)
+        for (a, b), area in zip(pieces, areas):
+            if rethrows((a + b) / 2, d, bit):
+                total += rethrow_win * (b - a)
+            else:
+                total += area
+    return total
+
+
+def win_probability_curve(ds) -> np.ndarray:
+    """win_probability for every d of an array."""
+    return np.array([float(win_probability(float(d))) for d in np.asarray(ds).reshape(-1)])
+
+
+def main():
+
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**7
+
+    from engine import Simulator
+
+    ds = np.linspace(0.0, 0.5, 11)
+
+    start = time.perf_counter()
+    exact = win_probability_curve(ds)
+    exact_time = (time.perf_counter() - start) / len(ds)
+
+    start = time.perf_counter()
+    estimate, _ = Simulator(seed=0).win_rate(ds, n)
+    mc_time = time.perf_counter() - start
+
+    print(f"{'d':>6} {'exact':>14} {'monte carlo':>14} {'z':>7}")
+    for d, p, q in zip(ds, exact, estimate):
+        z = (q - p) / np.sqrt(p * (1 - p) / n)
+        print(f"{d:6.3f} {p:14.10f} {q:14.10f} {z:7.2f}")
+    print(f"exact: {1e6 * exact_time:.1f} us per d; "
+          f"monte carlo: {mc_time:.2f} s for {len(ds)} d values on {n} games")
+
+    dense = np.linspace(0.0, 1.0, 100001)
+    curve = win_probability_curve(dense)
+    best = np.argmax(curve)
+    print(f"best d on [0, 1]: {dense[best]:.5f}, win probability {curve[best]:.10f}")
+    half = Fraction(1, 2)
+    print(f"win probability at d = 1/2: {win_probability(half)} = {float(win_probability(half)):.12f}")
+
+
+if __name__ == '__main__':
+    main()
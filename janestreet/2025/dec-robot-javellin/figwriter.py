@@ -0,0 +1,125 @@
+"""
+Background figure writer for trial plots.
+
+naive.py used to draw and save a seaborn figure inside every trial, which
+cost far more than the trial itself. FigureWriter moves that off the
+simulation:
+
+  - submit() downsamples the cumulative curves to a fixed number of points and
+    puts the snapshot on a bounded queue without waiting; if the queue is full
+    the snapshot is dropped (and counted), the simulation never blocks,
+  - one daemon thread takes snapshots off the queue and renders them with a
+    plain matplotlib Figure (no pyplot state, so it is safe off the main thread),
+  - enabled=False turns it off, every=k only keeps every k-th iteration.
+"""
+import os
+import queue
+import threading
+
+import numpy as np
+
+
+def downsample_curves(d: float, spears_win: np.ndarray, bit: np.ndarray, points: int = 1000):
+    """
+    Cumulative winrate and information curves of one trial at no more than
+    points sample indices (always including the last one).
+    """
+    N = spears_win.shape[0]
+    idx = np.unique(np.linspace(1, N, min(points, N)).astype(np.int64))
+    cum_winrate = np.cumsum(spears_win, dtype=np.int64)[idx - 1] / idx
+    cum_info = np.cumsum(bit, dtype=np.int64)[idx - 1] / idx
+    return idx, cum_winrate, cum_info, np.full(len(idx), d)
+
+
+def render(d: float, N: int, idx, cum_winrate, cum_info, d_line, path: str, dpi: int = 160):
+    """Draw the three trial curves (d, cumulative winrate, information) and save them to path."""
+    import pandas as pd
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    df = pd.DataFrame({
+        "iteration": np.concatenate([idx, idx, idx]),
+        "value": np.concatenate([d_line, cum_winrate, cum_info]),
+        "metric": np.repeat(["d", "cumulative winrate", "information gained (P[j1 < d])"], repeats=len(idx)),
+    })
+
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    sns.lineplot(data=df, x="iteration", y="value", hue="metric", palette="rocket_r", ax=ax)
+    ax.set_xlabel("iteration (sample index)")
+    ax.set_ylabel("value")
+    ax.set_title(f"Trial metrics (d={d:.6f}, N={N})")
+    legend = ax.get_legend()
+    if legend is not None:
+        legend.set_title(None)
+    fig.tight_layout()
+    fig.savefig(path, dpi=dpi)
+
+
+class FigureWriter:
+    """
+    Renders trial snapshots to out_dir/iter_<iteration>.png on a background
+    thread. Counters: written, dropped (queue full) and skipped (disabled or
+    not a k-th iteration).
+    """
+
+    def __init__(self, out_dir: str = "figures", max_queue: int = 8, points: int = 1000,
+                 every: int = 1, enabled: bool = True, dpi: int = 160):
+        self.out_dir = out_dir
+        self.points = points
+        self.every = every
+        self.enabled = enabled
+        self.dpi = dpi
+        self.written = 0
+        self.dropped = 0
+        self.skipped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    def submit(self, d: float, spears_win: np.ndarray, bit: np.ndarray, iteration: int) -> bool:
+        """Queue a snapshot of one trial. Returns False if it was skipped or dropped."""
+        if not self.enabled or iteration % self.every:
+            self.skipped += 1
+            return False
+        if self._thread is None:
+            import seaborn as sns
+
+            # global style, so set it here on the caller's thread
+            sns.set_theme(style="ticks")
+            os.makedirs(self.out_dir, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="figure-writer", daemon=True)
+            self._thread.start()
+
+        snapshot = (d, spears_win.shape[0]) + downsample_curves(d, spears_win, bit, self.points) + (iteration,)
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def _run(self):
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                return
+            *curves, iteration = snapshot
+            path = os.path.join(self.out_dir, f"iter_{iteration}.png")
+            try:
+                render(*curves, path, self.dpi)
+                self.written += 1
+            except Exception as e:
+                print(f"figure writer: iteration {iteration} failed: {e}")
+
+    def close(self):
+        """Wait for the queued snapshots to be written and stop the thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,13 +1,16 @@
-import seaborn as sns
 import numpy as np
 from scipy.optimize import minimize_scalar
 
-import os
-import polars as pl
-import matplotlib.pyplot as plt
+import sys
+
+from figwriter import FigureWriter
+from shards import ShardedSampler
 
 iterations = 0
 
+# trial plots are written in the background; enabled=False or every=k to thin them out
+figure_writer = FigureWriter(out_dir="figures", every=1)
+
 """d < 1/2 implied. Solves S's preference of S1 or S2."""
 def resolveS(d: float, s1: float, bit: bool, s2: float, N: int):
 
@@ -38,55 +41,6 @@ def resolveS_mask(d: float, s1: np.ndarray, bit: np.ndarray) -> np.ndarray:
     select_s2 = np.where(bit, cond1, cond1 | ((~cond1) & (r < d)))
     return select_s2
 
-def save_epoch_plots(d: float, spears_win: np.ndarray, bit: np.ndarray, iteration : int, out_dir: str = "figures"):
-    """
-    Save a figure with 3 lines across sample index:
-    - d (constant line)
-    - cumulative winrate (cumulative mean of spears_win)
-    - cumulative information gained (cumulative mean of bit = [j1 < d])
-    """
-    N = spears_win.shape[0]
-    idx = np.arange(1, N + 1)
-    cum_winrate = np.cumsum(spears_win) / idx
-    cum_info = np.cumsum(bit) / idx
-    d_line = np.full(N, d)
-
-    os.makedirs(out_dir, exist_ok=True)
-    fname = f"iter_{iteration}.png"
-    path = os.path.join(out_dir, fname)
-
-    # Build tidy DataFrame for relplot (use Polars, then convert to pandas for seaborn)
-    df = pl.DataFrame({
-        "iteration": np.concatenate([idx, idx, idx]),
-        "value": np.concatenate([d_line, cum_winrate, cum_info]),
-        "metric": np.repeat(["d", "cumulative winrate", "information gained (P[j1 < d])"], repeats=N),
-    }).to_pandas()
-
-    sns.set_theme(style="ticks")
-    g = sns.relplot(
-        data=df,
-        x="iteration", y="value",
-        hue="metric",
-        kind="line",
-        height=5, aspect=1.6,
-        palette="rocket_r",
-        facet_kws=dict(legend_out=False),
-    )
-    g.set_axis_labels("iteration (sample index)", "value")
-    # Put title inside the single facet axes instead of a suptitle
-    g.ax.set_title(f"Trial metrics (d={d:.6f}, N={N})")
-    # Keep legend inside and stable
-    if g._legend is not None:
-        g._legend.set_title(None)
-        g._legend.set_loc("best")
-    g.figure.tight_layout()
-    g.figure.savefig(path, dpi=160)
-    g.figure.clear()
-    plt.close(g.figure)
-    
-
-
-
 """
 One trial given some d. d is used for checking j1 < d.
 No need to do anything fancy for > d, uniformity and iid imply d = 1-d* at the end.
@@ -119,8 +73,8 @@ def trial(d: float, N):
     spears_win = ts > tj
     # wins = np.where(spears_win, ts, tj)
 
-    # save plot with 3 lines for this trial
-    save_epoch_plots(d, spears_win.astype(int), bit.astype(int), iterations, out_dir="figures")
+    # queue a plot with 3 lines for this trial, drawn by figure_writer's thread
+    figure_writer.submit(d, spears_win, bit, iterations)
 
     return sum(spears_win) / N, information_gained
 
@@ -130,7 +84,15 @@ def objective(d):
     return -winrate
 
 
-def run():
+def sharded_objective(sampler: ShardedSampler):
+    """objective() on sampler.n games split across the sampler's worker processes."""
+    def objective(d):
+        winrate, _ = sampler.win_rate(d)
+        return -winrate[0]
+    return objective
+
+
+def run(objective=objective):
     result = minimize_scalar(objective, bounds=(
         0.00, 0.50), method='bounded', options={'xatol': 1e-12})
 
@@ -144,9 +106,23 @@ def run():
 
 def main():
     "idea: Asking j1 < d should be maximally informative for Spears, thus should be 50%"
+    # python naive.py [workers] [games per trial] [seed]: sharded across processes, no trial plots
+    if len(sys.argv) > 1:
+        workers = int(sys.argv[1])
+        n = int(float(sys.argv[2])) if len(sys.argv) > 2 else 10**6
+        seed = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+        with ShardedSampler(n, workers=workers, seed=seed) as sampler:
+            for i in range(10):
+                run(sharded_objective(sampler))
+        return
+
     for i in range(10):
         run()
 
+    figure_writer.close()
+    print(f"figures: {figure_writer.written} written, {figure_writer.dropped} dropped, "
+          f"{figure_writer.skipped} skipped")
+
 
 if __name__ == "__main__":
     main()
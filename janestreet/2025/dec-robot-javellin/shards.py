@@ -0,0 +1,110 @@
+"""
+Process-pool sharded Monte Carlo for Java-lin v. Spears.
+
+A batch of n games is always split into the same fixed number of shards, and
+shard i always draws from child i of a numpy SeedSequence, so which games get
+played never depends on how many processes there are. Workers only send back
+integer counts (Spears wins and [j1 < d] bits per d), which the parent adds up:
+the totals are bit-for-bit the same with 1 worker or 64.
+
+Every call to counts() spawns a fresh child of the root sequence, so successive
+calls see fresh games (like trial() in naive.py), and the whole run replays
+exactly from the seed.
+
+usage: python shards.py [num_games] [workers]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine import Simulator
+
+
+def shard_sizes(n: int, shards: int) -> list:
+    """Split n games over shards: the first n % shards shards get one more."""
+    q, r = divmod(n, shards)
+    return [q + (i < r) for i in range(shards)]
+
+
+def shard_counts(ds: np.ndarray, n: int, seed: np.random.SeedSequence, block: int):
+    """Play one shard of n games from seed. Returns integer (wins, info) per d."""
+    return Simulator(seed, block).simulate(ds, n)
+
+
+class ShardedSampler:
+    """
+    Plays n games per call for many d values, in shards fixed by (n, shards)
+    and seeded from SeedSequence(seed), on a pool of workers (0 = in process).
+    """
+
+    def __init__(self, n: int, shards: int = 64, workers: int = None, seed: int = 0, block: int = 1 << 14):
+        self.n = n
+        self.shards = shards
+        self.block = block
+        self.root = np.random.SeedSequence(seed)
+        self.workers = os.cpu_count() if workers is None else workers
+        self.calls = 0
+        self._pool = ProcessPoolExecutor(self.workers) if self.workers > 0 else None
+
+    def counts(self, ds):
+        """Integer (wins, info) per d over the next n games."""
+        ds = np.atleast_1d(np.asarray(ds, dtype=float))
+        seeds = self.root.spawn(1)[0].spawn(self.shards)
+        sizes = shard_sizes(self.n, self.shards)
+        self.calls += 1
+
+        args = ([ds] * self.shards, sizes, seeds, [self.block] * self.shards)
+        results = self._pool.map(shard_counts, *args) if self._pool else map(shard_counts, *args)
+
+        wins = np.zeros(len(ds), dtype=np.int64)
+        info = np.zeros(len(ds), dtype=np.int64)
+        for w, i in results:
+            wins += w
+            info += i
+        return wins, info
+
+    def win_rate(self, ds):
+        """(winrate, information gained) per d over the next n games."""
+        wins, info = self.counts(ds)
+        return wins / self.n, info / self.n
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**7
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    ds = np.linspace(0.0, 0.5, 11)
+
+    results = {}
+    for w in sorted({0, workers}):
+        with ShardedSampler(n, workers=w) as sampler:
+            start = time.perf_counter()
+            results[w] = sampler.counts(ds)
+            elapsed = time.perf_counter() - start
+        print(f"{w} workers: {n} games x {len(ds)} d values in {elapsed:.2f} seconds")
+
+    same = all(np.array_equal(a, b) for a, b in zip(results[0], results[workers]))
+    print(f"identical counts in process and with {workers} workers: {same}")
+    wins, info = results[workers]
+    best = np.argmax(wins)
+    print(f"Maximum winrate achieved : {wins[best] / n:.10f}")
+    print(f"Maximally Informative d boundary: {ds[best]:.10f}")
+    print(f"Information gained: {info[best] / n:.10f}")
+
+
+if __name__ == '__main__':
+    main()
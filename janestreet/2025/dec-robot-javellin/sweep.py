@@ -0,0 +1,136 @@
+"""
+Strategy-space sweep for Java-lin v. Spears.
+
+Strategies are thresholds:
+
+  Java-lin  keeps j1 if j1 > tJ, else throws j2 (naive.py: tJ = 0.5),
+  Spears    learns bit = [j1 < d] and rethrows if s1 < tS_bit, one threshold
+            for each answer (naive.py's resolveS_mask is close to this).
+
+Spears' two thresholds only ever matter on their own half of the games, so a
+grid over (tJ, d, tS) counting wins separately for bit = 1 (low) and bit = 0
+(high) covers every (tJ, d, tS_low, tS_high) strategy at once:
+
+    wins(tJ, d, tS_low, tS_high) = low[tJ, d, tS_low] + high[tJ, d, tS_high]
+
+For a block of games the (tJ x tS) x games win matrix is built by
+broadcasting; multiplying it by the d x games bit matrix gives every low
+count in one BLAS call. Blocks are sized to a memory budget.
+
+usage: python sweep.py [num_games] [grid points]
+"""
+import collections
+import sys
+import time
+
+import numpy as np
+
+Surface = collections.namedtuple("Surface", ["tJs", "ds", "tSs", "n", "low", "high"])
+
+
+def sweep(tJs, ds, tSs, n: int, seed: int = 0, max_bytes: int = 1 << 26) -> Surface:
+    """
+    Play n games for every (tJ, d, tS) on the grid. Returns a Surface whose
+    low[a, b, c] and high[a, b, c] count Spears wins with Java-lin threshold
+    tJs[a], cutoff ds[b] and Spears threshold tSs[c], among games where j1 < d
+    and j1 >= d respectively.
+    """
+    tJs = np.asarray(tJs, dtype=float)
+    ds = np.asarray(ds, dtype=float)
+    tSs = np.asarray(tSs, dtype=float)
+    A, B, C = len(tJs), len(ds), len(tSs)
+
+    # float32 counts are exact below 2^24 per block
+    block = int(min(1 << 20, max(256, max_bytes // (5 * A * C))))
+    rng = np.random.default_rng(seed)
+    games = np.empty((4, block))
+    tj = np.empty((A, block))
+    ts = np.empty((C, block))
+    win = np.empty((A, C, block), dtype=bool)
+    win32 = np.empty((A * C, block), dtype=np.float32)
+    bit32 = np.empty((B, block), dtype=np.float32)
+
+    low = np.zeros((A * C, B), dtype=np.int64)
+    total = np.zeros(A * C, dtype=np.int64)
+    done = 0
+    while done < n:
+        m = min(block, n - done)
+        j1, s1, j2, s2 = games[:, :m]
+        for row in (j1, s1, j2, s2):
+            rng.random(out=row)
+
+        np.copyto(tj[:, :m], j2)
+        np.copyto(tj[:, :m], j1, where=j1 > tJs[:, None])
+        np.copyto(ts[:, :m], s1)
+        np.copyto(ts[:, :m], s2, where=s1 < tSs[:, None])
+        np.greater(ts[None, :, :m], tj[:, None, :m], out=win[:, :, :m])
+        np.copyto(win32[:, :m], win[:, :, :m].reshape(A * C, m))
+        np.less(j1, ds[:, None], out=bit32[:, :m], casting="unsafe")
+
+        low += np.rint(win32[:, :m] @ bit32[:, :m].T).astype(np.int64)
+        total += np.rint(win32[:, :m].sum(axis=1, dtype=np.float64)).astype(np.int64)
+        done += m
+
+    low = low.reshape(A, C, B).transpose(0, 2, 1)
+    high = total.reshape(A, 1, C) - low
+    return Surface(tJs, ds, tSs, n, low, high)
+
+
+def win_rate(surface: Surface) -> np.ndarray:
+    """Spears' win rate for every (tJ, d, tS_low, tS_high) on the grid."""
+    return (surface.low[:, :, :, None] + surface.high[:, :, None, :]) / surface.n
+
+
+def spears_best_response(surface: Surface):
+    """
+    For every (tJ, d): Spears' best thresholds and the win rate they get.
+    Returns (tS_low, tS_high, winrate), each of shape (len(tJs), len(ds)).
+    """
+    c_low = surface.low.argmax(axis=2)
+    c_high = surface.high.argmax(axis=2)
+    value = (surface.low.max(axis=2) + surface.high.max(axis=2)) / surface.n
+    return surface.tSs[c_low], surface.tSs[c_high], value
+
+
+def javelin_best_response(surface: Surface):
+    """
+    For every (d, tS_low, tS_high): Java-lin's threshold minimizing Spears'
+    win rate, and that win rate. Shapes (len(ds), len(tSs), len(tSs)).
+    """
+    rates = win_rate(surface)
+    return surface.tJs[rates.argmin(axis=0)], rates.min(axis=0)
+
+
+def main():
+
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10**6
+    points = int(sys.argv[2]) if len(sys.argv) > 2 else 41
+    grid = np.linspace(0.0, 1.0, points)
+
+    start = time.perf_counter()
+    surface = sweep(grid, grid, grid, n)
+    elapsed = time.perf_counter() - start
+    print(f"{points}^3 grid x 2 Spears thresholds, {n} games in {elapsed:.2f} seconds")
+
+    tS_low, tS_high, value = spears_best_response(surface)
+    a = np.argmin(np.abs(grid - 0.5))
+    for d in (0.0, 0.5):
+        b = np.argmin(np.abs(grid - d))
+        print(f"Java-lin tJ = 0.5, d = {d}: Spears best response tS = ({tS_low[a, b]:.3f}, {tS_high[a, b]:.3f}), "
+              f"winrate {value[a, b]:.4f}")
+
+    # Java-lin minimizing against a best-responding Spears
+    for d in (0.0, 0.5):
+        b = np.argmin(np.abs(grid - d))
+        a_star = np.argmin(value[:, b])
+        print(f"d = {d}: Java-lin's minimax tJ = {grid[a_star]:.3f}, Spears winrate {value[a_star, b]:.4f}")
+
+    # writeup.md's equilibrium guess without information (d = 0): both thresholds 0.5
+    tJ_best, _ = javelin_best_response(surface)
+    c = np.argmin(np.abs(grid - 0.5))
+    print(f"no information: Spears' best response to tJ = 0.5 is tS = {tS_high[a, 0]:.3f}, "
+          f"Java-lin's best response to tS = 0.5 is tJ = {tJ_best[0, c, c]:.3f}")
+
+
+if __name__ == '__main__':
+    main()
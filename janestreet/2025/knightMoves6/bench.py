@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bitmask engine against the set/tuple dfs in multithreading.py.
+
+usage: python bench.py [num_candidates] [min_sum]
+
+Small A+B+C candidates take minutes each with the old dfs, so by default the
+sample is drawn from candidates with A+B+C >= 25.
+"""
+import functools
+import random
+import sys
+import time
+
+import engine
+import multithreading
+
+
+def sample_candidates(count, min_sum, seed=0):
+    candidates = [
+        (A_val, B_val, C_val)
+        for A_val in range(1, 50)
+        for B_val in range(1, 50)
+        for C_val in range(1, 50)
+        if len({A_val, B_val, C_val}) == 3 and min_sum <= A_val + B_val + C_val < 50
+    ]
+    return random.Random(seed).sample(candidates, min(count, len(candidates)))
+
+
+def time_search(search, candidates):
+    start_time = time.perf_counter()
+    results = [search(candidate) for candidate in candidates]
+    return time.perf_counter() - start_time, results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    min_sum = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    candidates = sample_candidates(count, min_sum)
+
+    # compare the bare searches, without the pruning oracle
+    old_time, old_results = time_search(functools.partial(multithreading.candidate_search, use_oracle=False), candidates)
+    new_time, new_results = time_search(functools.partial(engine.candidate_search, use_oracle=False), candidates)
+
+    if old_results != new_results:
+        print("MISMATCH between multithreading.dfs and engine.find_path")
+        sys.exit(1)
+
+    solved = sum(res is not None for res in new_results)
+    print(f"{len(candidates)} candidates (A+B+C >= {min_sum}), {solved} solved")
+    print(f"{'set/tuple dfs':<15} {old_time:10.3f} s  {1e3 * old_time / len(candidates):8.3f} ms/candidate")
+    print(f"{'bitmask engine':<15} {new_time:10.3f} s  {1e3 * new_time / len(candidates):8.3f} ms/candidate")
+    print(f"speedup: {old_time / new_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
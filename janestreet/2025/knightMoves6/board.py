@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Board model for knight-move scoring puzzles.
+
+A board is an N x M grid of region letters, a list of (start, target) tours and
+a target score. It loads from a text or JSON file and precomputes everything
+the searches need once: square indices (row * cols + col, a1 = 0), region
+index per square, knight neighbour lists and bitmasks, and the same-region
+table that decides add vs multiply for every move.
+
+Text format (rows top rank first, as the board is drawn; '#' starts a comment):
+
+    goal 2024
+    tour a1 f6
+    tour a6 f1
+    A B B C C C
+    ...
+
+JSON format:
+
+    {"goal": 2024, "tours": [["a1", "f6"], ["a6", "f1"]],
+     "grid": ["ABBCCC", ...]}
+"""
+import json
+import os
+
+KNIGHT_MOVES = [(2, 1), (2, -1), (-2, 1), (-2, -1),
+                (1, 2), (1, -2), (-1, 2), (-1, -2)]
+
+DEFAULT_BOARD_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "boards", "knight6.txt")
+
+
+class Board:
+    """
+    grid[r][c] is the region letter of square (r, c), row 0 being rank 1.
+
+    Tables indexed by square (row * cols + col):
+      region[sq]            - region index, letters sorted (A = 0, B = 1, ...)
+      neighbors[sq]         - tuple of knight-move neighbours
+      neighbor_mask[sq]     - the same neighbours as a bitmask
+      same_region[a][b]     - True if a move a -> b adds rather than multiplies
+    """
+
+    def __init__(self, grid, tours, goal=2024):
+        self.grid = [list(row) for row in grid]
+        self.rows = len(self.grid)
+        self.cols = len(self.grid[0])
+        if any(len(row) != self.cols for row in self.grid):
+            raise ValueError("board rows must all have the same length")
+        self.num_squares = self.rows * self.cols
+        self.goal = goal
+
+        self.letters = sorted({letter for row in self.grid for letter in row})
+        index = {letter: i for i, letter in enumerate(self.letters)}
+        self.region = [index[self.grid[sq // self.cols][sq % self.cols]] for sq in range(self.num_squares)]
+
+        self.neighbors = []
+        self.neighbor_mask = []
+        for sq in range(self.num_squares):
+            r, c = divmod(sq, self.cols)
+            nbrs = []
+            for dr, dc in KNIGHT_MOVES:
+                nr, nc = r + dr, c + dc
+                if 0 <= nr < self.rows and 0 <= nc < self.cols:
+                    nbrs.append(nr * self.cols + nc)
+            self.neighbors.append(tuple(nbrs))
+            self.neighbor_mask.append(sum(1 << n for n in nbrs))
+
+        self.same_region = [[self.region[a] == self.region[b] for b in range(self.num_squares)]
+                            for a in range(self.num_squares)]
+
+        self.tours = [(self.square(start), self.square(target)) for start, target in tours]
+
+    @property
+    def num_regions(self):
+        return len(self.letters)
+
+    def square(self, pos):
+        """Square index of a chess-notation name ('a1') or (r, c) coordinates."""
+        if isinstance(pos, str):
+            c = ord(pos[0].lower()) - ord('a')
+            r = int(pos[1:]) - 1
+        else:
+            r, c = pos
+        if not (0 <= r < self.rows and 0 <= c < self.cols):
+            raise ValueError(f"square {pos!r} is off the {self.rows}x{self.cols} board")
+        return r * self.cols + c
+
+    def square_to_str(self, sq):
+        """Convert a square index to chess notation (e.g. 0 -> 'a1')."""
+        r, c = divmod(sq, self.cols)
+        return chr(ord('a') + c) + str(r + 1)
+
+    @classmethod
+    def load(cls, path=DEFAULT_BOARD_FILE):
+        """Load a board from a .json file or the text format above."""
+        with open(path) as file:
+            if path.endswith(".json"):
+                spec = json.load(file)
+                return cls(list(reversed(spec["grid"])), spec["tours"], spec.get("goal", 2024))
+            lines = file.read().splitlines()
+
+        goal = 2024
+        tours = []
+        rows = []
+        for line in lines:
+            words = line.split("#", 1)[0].split()
+            if not words:
+                continue
+            if words[0] == "goal":
+                goal = int(words[1])
+            elif words[0] == "tour":
+                tours.append((words[1], words[2]))
+            else:
+                rows.append(words if len(words) > 1 else list(words[0]))
+        # files list the top rank first
+        return cls(list(reversed(rows)), tours, goal)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Bitmask knight path engine.
+
+Squares are indexed as row * cols + col (on the 6x6 board a1 = 0, f1 = 5,
+a6 = 30, f6 = 35), visited squares live in a single int bitmask and every
+move's "same region / different region" outcome is precomputed by the Board,
+so the inner loop of the search does no hashing and allocates no tuples.
+
+Every function takes the board as an optional argument and defaults to the
+Knight Moves 6 board in boards/knight6.txt.
+"""
+import sys
+
+from board import Board
+from oracle import Oracle
+
+# Increase recursion limit in case deep search is needed.
+sys.setrecursionlimit(10000)
+
+BOARD = Board.load()
+
+# Shorthands for the default board.
+SIZE = BOARD.cols
+NUM_SQUARES = BOARD.num_squares
+GOAL = BOARD.goal
+REGION = BOARD.region
+NEIGHBORS = BOARD.neighbors
+NEIGHBOR_MASK = BOARD.neighbor_mask
+SAME_REGION = BOARD.same_region
+
+
+def square(pos, board=BOARD):
+    """Convert board coordinates (r, c) or a name like 'a1' to a square index."""
+    return board.square(pos)
+
+
+def square_to_str(sq, board=BOARD):
+    """Convert a square index to chess notation (e.g. 0 -> 'a1')."""
+    return board.square_to_str(sq)
+
+
+def compile_moves(values, board=BOARD):
+    """
+    Bake the region values (A, B, C, ...) into the move table.
+
+    Returns, for every square, a tuple of (next square, next square bit,
+    same region, value of next square) so the search only does int arithmetic.
+    """
+    moves = []
+    for sq in range(board.num_squares):
+        moves.append(tuple(
+            (nxt, 1 << nxt, board.same_region[sq][nxt], values[board.region[nxt]])
+            for nxt in board.neighbors[sq]
+        ))
+    return moves
+
+
+def make_oracle(values, start, target, goal=None, board=BOARD):
+    """Pruning oracle for values = (A, B, C, ...) on the tour start -> target."""
+    goal = board.goal if goal is None else goal
+    return Oracle(values, target, board.neighbors, board.region, goal, min_score=values[board.region[start]])
+
+
+def find_path(values, start, target, goal=None, oracle=None, board=BOARD):
+    """
+    Find a knight path (without revisiting squares) from start to target whose
+    score is exactly goal (the board's goal by default). values holds one value
+    per region; start and target are square indices. Returns the list of
+    squares visited, or None.
+
+    If an oracle is given, moves it rejects are not expanded.
+    """
+    goal = board.goal if goal is None else goal
+    score = values[board.region[start]]
+    if score > goal:
+        return None
+    if start == target:
+        return [start] if score == goal else None
+
+    moves = compile_moves(values, board)
+    path = [start]
+    admits = oracle.admits if oracle is not None else None
+
+    def search(sq, score, visited):
+        for nxt, bit, same, value in moves[sq]:
+            if visited & bit:
+                continue
+            new_score = score + value if same else score * value
+            if new_score > goal:
+                continue
+            path.append(nxt)
+            if nxt == target:
+                if new_score == goal:
+                    return True
+            elif admits is None or admits(nxt, new_score, visited | bit):
+                if search(nxt, new_score, visited | bit):
+                    return True
+            path.pop()
+        return False
+
+    if search(start, score, 1 << start):
+        return path
+    return None
+
+
+def format_solution(candidate, tours, board=BOARD):
+    """'A,B,C,<tour 1 squares>,<tour 2 squares>,...' as the puzzle wants it."""
+    parts = [str(value) for value in candidate]
+    for tour in tours:
+        parts.extend(board.square_to_str(sq) for sq in tour)
+    return ",".join(parts)
+
+
+# -----------------------
+# Candidate search function
+# -----------------------
+def solve_candidate(candidate, use_oracle=True, stats=None, board=BOARD):
+    """
+    Find a path for every tour on the board under candidate values. Returns the
+    list of tours (lists of square indices), or None if some tour has none.
+
+    If stats is a dict, the number of nodes the oracle pruned is added to
+    stats["pruned"].
+    """
+    tours = []
+    for start, target in board.tours:
+        oracle = make_oracle(candidate, start, target, board=board) if use_oracle else None
+        sol = find_path(candidate, start, target, oracle=oracle, board=board)
+        if stats is not None and oracle is not None:
+            stats["pruned"] = stats.get("pruned", 0) + oracle.pruned
+        if sol is None:
+            return None
+        tours.append(sol)
+    return tours
+
+
+def candidate_search(candidate, use_oracle=True, stats=None, board=BOARD):
+    """Drop-in replacement for multithreading.candidate_search, for every tour on the board."""
+    tours = solve_candidate(candidate, use_oracle, stats, board)
+    if tours is None:
+        return None
+    return (sum(candidate), format_solution(candidate, tours, board))
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Enumerate-once reachable-score index for the two knight tours.
+
+A tour's score only depends on the sequence of squares' letters and whether
+each move stays in the same region (add) or changes region (multiply), not on
+the squares themselves. So every simple knight path a1 -> f6 and a6 -> f1 (up
+to max_moves moves) is walked exactly once and compiled into a trie keyed by
+move codes (region << 1 | same region), with one witness path per distinct
+code sequence. A candidate (A, B, C) is then evaluated by walking the trie,
+pruning on score bounds, instead of searching the board again.
+
+usage: python index.py [max_moves] [index file]
+"""
+import os
+import pickle
+import sys
+import time
+
+import multithreading
+from engine import BOARD, format_solution
+
+# Increase recursion limit in case deep search is needed.
+sys.setrecursionlimit(10000)
+
+DEFAULT_MAX_MOVES = 14
+DEFAULT_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "paths_{}.pkl")
+
+
+def knight_distances(target, board=BOARD):
+    """BFS distance (in knight moves) from every square to target."""
+    dist = [None] * board.num_squares
+    dist[target] = 0
+    frontier = [target]
+    while frontier:
+        nxt_frontier = []
+        for sq in frontier:
+            for nxt in board.neighbors[sq]:
+                if dist[nxt] is None:
+                    dist[nxt] = dist[sq] + 1
+                    nxt_frontier.append(nxt)
+        frontier = nxt_frontier
+    return dist
+
+
+class PathTrie:
+    """
+    Trie of move-code sequences for all simple paths start -> target.
+
+    Nodes are numbered from 0 (the root, i.e. the start square). For node i:
+      edges[i]    - tuple of (move code, child node)
+      witness[i]  - a path (tuple of squares) whose code sequence ends here, or None
+      height[i]   - longest code sequence below i, used for score upper bounds
+    """
+
+    def __init__(self, start, target, max_moves, board=BOARD):
+        self.start = start
+        self.target = target
+        self.max_moves = max_moves
+        self.start_region = board.region[start]
+        self.num_paths = 0
+
+        children = [{}]
+        witness = [None]
+        dist = knight_distances(target, board)
+        # unreachable squares never get a distance and are never walked onto
+        dist = [max_moves + 1 if d is None else d for d in dist]
+        path = [start]
+        codes = []
+
+        def insert():
+            node = 0
+            for code in codes:
+                child = children[node].get(code)
+                if child is None:
+                    child = len(children)
+                    children[node][code] = child
+                    children.append({})
+                    witness.append(None)
+                node = child
+            if witness[node] is None:
+                witness[node] = tuple(path)
+
+        def walk(sq, visited, moves_left):
+            for nxt in board.neighbors[sq]:
+                bit = 1 << nxt
+                if visited & bit or dist[nxt] >= moves_left:
+                    continue
+                path.append(nxt)
+                codes.append(board.region[nxt] << 1 | board.same_region[sq][nxt])
+                if nxt == self.target:
+                    self.num_paths += 1
+                    insert()
+                else:
+                    walk(nxt, visited | bit, moves_left - 1)
+                codes.pop()
+                path.pop()
+
+        walk(start, 1 << start, max_moves + 1)
+
+        self.edges = [tuple(sorted(node.items())) for node in children]
+        self.witness = witness
+        self.height = [0] * len(children)
+        # children are always numbered after their parent
+        for node in range(len(children) - 1, -1, -1):
+            for _, child in self.edges[node]:
+                self.height[node] = max(self.height[node], self.height[child] + 1)
+
+    def __len__(self):
+        return len(self.edges)
+
+    def find(self, values, goal=BOARD.goal):
+        """
+        Return a path from start to target scoring exactly goal under
+        values = (A, B, C, ...), or None.
+        """
+        score = values[self.start_region]
+        max_val = max(values)
+        # need[h] is the smallest score from which h more moves can still reach goal
+        need = [goal]
+        for _ in range(self.max_moves):
+            need.append(max(1, min(need[-1] - max_val, -(-need[-1] // max_val))))
+        ops = [(code & 1, values[code >> 1]) for code in range(2 * len(values))]
+        edges, witness, height = self.edges, self.witness, self.height
+
+        def search(node, score):
+            if score == goal and witness[node] is not None:
+                return witness[node]
+            for code, child in edges[node]:
+                same, value = ops[code]
+                new_score = score + value if same else score * value
+                if new_score > goal or new_score < need[height[child]]:
+                    continue
+                result = search(child, new_score)
+                if result is not None:
+                    return result
+            return None
+
+        if score > goal or score < need[self.height[0]]:
+            return None
+        return search(0, score)
+
+
+class PathIndex:
+    """Tries for every tour on the board, built once and reusable for every (A, B, C)."""
+
+    def __init__(self, max_moves=DEFAULT_MAX_MOVES, board=BOARD):
+        self.max_moves = max_moves
+        self.board = board
+        self.tries = [PathTrie(start, target, max_moves, board) for start, target in board.tours]
+
+    def save(self, path):
+        # plain containers only, so the file loads whether this module was run
+        # as a script or imported
+        state = {"max_moves": self.max_moves, "tries": [vars(trie) for trie in self.tries]}
+        with open(path, "wb") as file:
+            pickle.dump(state, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, board=BOARD):
+        with open(path, "rb") as file:
+            state = pickle.load(file)
+        index = cls.__new__(cls)
+        index.max_moves = state["max_moves"]
+        index.board = board
+        index.tries = []
+        for trie_state in state["tries"]:
+            trie = PathTrie.__new__(PathTrie)
+            trie.__dict__.update(trie_state)
+            index.tries.append(trie)
+        return index
+
+    @classmethod
+    def load_or_build(cls, max_moves=DEFAULT_MAX_MOVES, path=None, board=BOARD):
+        """Load the index from disk if present, otherwise build and persist it."""
+        path = path or DEFAULT_INDEX_FILE.format(max_moves)
+        if os.path.exists(path):
+            index = cls.load(path, board)
+            if index.max_moves == max_moves and [(t.start, t.target) for t in index.tries] == board.tours:
+                return index
+        index = cls(max_moves, board)
+        index.save(path)
+        return index
+
+    def candidate_search(self, candidate, goal=None):
+        """Same result format as multithreading.candidate_search."""
+        goal = self.board.goal if goal is None else goal
+        tours = []
+        for trie in self.tries:
+            sol = trie.find(candidate, goal)
+            if sol is None:
+                return None
+            tours.append(sol)
+        return (sum(candidate), format_solution(candidate, tours, self.board))
+
+
+def main():
+    max_moves = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_MAX_MOVES
+    index_file = sys.argv[2] if len(sys.argv) > 2 else None
+
+    start_time = time.time()
+    index = PathIndex.load_or_build(max_moves, index_file)
+    for trie in index.tries:
+        print(f"{index.board.square_to_str(trie.start)} -> {index.board.square_to_str(trie.target)}: "
+              f"{trie.num_paths} paths, {len(trie)} trie nodes")
+    print(f"Index ready in {time.time() - start_time:.2f} seconds")
+
+    best_solution = None
+    for _, level in multithreading.candidates_by_sum(50, index.board.num_regions):
+        for candidate in level:
+            res = index.candidate_search(candidate)
+            if res is not None:
+                best_sum, best_solution = res
+                print(f"Found solution with {'+'.join(index.board.letters)} = {best_sum}: {best_solution}")
+                break
+        # levels come smallest sum first, so the first hit is the optimum
+        if best_solution is not None:
+            break
+
+    print(f"Elapsed time: {time.time() - start_time:.2f} seconds")
+    if best_solution is None:
+        print("No solution found.")
+    else:
+        print("Final solution:")
+        print(best_solution)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,27 +2,15 @@
 #!/usr/bin/env python3
 import sys
 
+from board import Board
+
 # Increase recursion limit in case deep search is needed.
 sys.setrecursionlimit(10000)
 
 def main():
-    # The board is fixed (rows 0..5 correspond to chess rows 1..6, with row0 = a1,...)
-    # Board layout (each inner list is a row; row0 is bottom (row1) and row5 is top (row6)):
-    #   a    b    c    d    e    f
-    #6: A    B    B    C    C    C   -> row5
-    #5: A    B    B    C    C    C   -> row4
-    #4: A    A    B    B    C    C   -> row3
-    #3: A    A    B    B    C    C   -> row2
-    #2: A    A    A    B    B    C   -> row1
-    #1: A    A    A    B    B    C   -> row0
-    board = [
-        ['A', 'A', 'A', 'B', 'B', 'C'],  # row0 = a1, b1, c1, d1, e1, f1
-        ['A', 'A', 'A', 'B', 'B', 'C'],  # row1 = a2, b2, c2, d2, e2, f2
-        ['A', 'A', 'B', 'B', 'C', 'C'],  # row2 = a3, b3, c3, d3, e3, f3
-        ['A', 'A', 'B', 'B', 'C', 'C'],  # row3 = a4, b4, c4, d4, e4, f4
-        ['A', 'B', 'B', 'C', 'C', 'C'],  # row4 = a5, b5, c5, d5, e5, f5
-        ['A', 'B', 'B', 'C', 'C', 'C']   # row5 = a6, b6, c6, d6, e6, f6
-    ]
+    # The board layout lives in boards/knight6.txt (rows 0..5 correspond to
+    # chess rows 1..6, with row0 = a1,...).
+    board = Board.load().grid
     
     # Pre-calculate knight moves for each square.
     knight_moves = [(2, 1), (2, -1), (-2, 1), (-2, -1),
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Meet-in-the-middle search for knight paths scoring exactly 2024.
+
+The forward half enumerates partial paths from the start, the backward half
+enumerates partial paths back from the target, running the scoring rule in
+reverse: stepping back over a same-region move subtracts the value, stepping
+back over a region change divides by it (and dies unless it divides evenly).
+Both halves are memoized on (square, visited mask, score), so two partial paths
+that reach the same square with the same squares used and the same score are
+only expanded once. The halves are joined on (midpoint square, score) and the
+visited masks must only overlap at the midpoint.
+
+usage: python mitm.py [max_moves] [num_candidates]
+"""
+import sys
+import time
+
+import engine
+import multithreading
+from engine import BOARD, format_solution
+
+DEFAULT_MAX_MOVES = 16
+
+
+def forward_states(values, start, target, depth, goal, board=BOARD):
+    """
+    Expand partial paths of exactly depth moves from start that avoid target.
+
+    Returns (layer, hit, explored): layer maps (square, visited mask, score)
+    to one path reaching that state, hit is a path of at most depth moves that
+    already reaches target scoring goal (or None).
+    """
+    region, same_region = board.region, board.same_region
+    layer = {(start, 1 << start, values[region[start]]): (start,)}
+    explored = 1
+    for _ in range(depth):
+        nxt_layer = {}
+        for (sq, visited, score), path in layer.items():
+            for nxt in board.neighbors[sq]:
+                bit = 1 << nxt
+                if visited & bit:
+                    continue
+                value = values[region[nxt]]
+                new_score = score + value if same_region[sq][nxt] else score * value
+                if new_score > goal:
+                    continue
+                if nxt == target:
+                    if new_score == goal:
+                        return nxt_layer, path + (nxt,), explored
+                    continue
+                key = (nxt, visited | bit, new_score)
+                if key not in nxt_layer:
+                    nxt_layer[key] = path + (nxt,)
+        explored += len(nxt_layer)
+        layer = nxt_layer
+    return layer, None, explored
+
+
+def backward_states(values, start_score, target, depth, goal, board=BOARD):
+    """
+    Expand partial paths of 1..depth moves ending at target, scoring backwards
+    from goal.
+
+    Returns (table, explored): table maps (first square, score required on
+    arrival there) to a list of (visited mask, path) for the suffixes.
+    """
+    table = {}
+    layer = {(target, 1 << target, goal): (target,)}
+    explored = 1
+    for _ in range(depth):
+        nxt_layer = {}
+        for (sq, visited, need), path in layer.items():
+            value = values[board.region[sq]]
+            for prev in board.neighbors[sq]:
+                bit = 1 << prev
+                if visited & bit:
+                    continue
+                if board.same_region[prev][sq]:
+                    prev_need = need - value
+                elif need % value:
+                    continue
+                else:
+                    prev_need = need // value
+                # scores never decrease, so nothing below the start score is reachable
+                if prev_need < start_score:
+                    continue
+                key = (prev, visited | bit, prev_need)
+                if key not in nxt_layer:
+                    nxt_layer[key] = (prev,) + path
+        for (sq, visited, need), path in nxt_layer.items():
+            table.setdefault((sq, need), []).append((visited, path))
+        explored += len(nxt_layer)
+        layer = nxt_layer
+    return table, explored
+
+
+def find_path(values, start, target, max_moves=DEFAULT_MAX_MOVES, goal=None, stats=None, board=BOARD):
+    """
+    Find a knight path of at most max_moves moves from start to target scoring
+    exactly goal (the board's goal by default) under values = (A, B, C, ...).
+    Returns the list of squares, or None.
+
+    If stats is a dict, the number of explored states is added to stats["explored"].
+    """
+    goal = board.goal if goal is None else goal
+    start_score = values[board.region[start]]
+    if start == target:
+        return [start] if start_score == goal else None
+
+    forward_depth = (max_moves + 1) // 2
+    layer, hit, forward_explored = forward_states(values, start, target, forward_depth, goal, board)
+    backward_explored = 0
+    result = None
+    if hit is not None:
+        result = list(hit)
+    elif layer:
+        table, backward_explored = backward_states(values, start_score, target, max_moves - forward_depth,
+                                                   goal, board)
+        for (sq, visited, score), prefix in layer.items():
+            for suffix_visited, suffix in table.get((sq, score), ()):
+                if visited & suffix_visited == 1 << sq:
+                    result = list(prefix + suffix[1:])
+                    break
+            if result is not None:
+                break
+
+    if stats is not None:
+        stats["explored"] = stats.get("explored", 0) + forward_explored + backward_explored
+    return result
+
+
+def solve_candidate(candidate, max_moves=DEFAULT_MAX_MOVES, board=BOARD):
+    """Paths for every tour on the board (at most max_moves moves each), or None."""
+    tours = []
+    for start, target in board.tours:
+        sol = find_path(candidate, start, target, max_moves, board=board)
+        if sol is None:
+            return None
+        tours.append(sol)
+    return tours
+
+
+def candidate_search(candidate, max_moves=DEFAULT_MAX_MOVES, board=BOARD):
+    """Same result format as multithreading.candidate_search, for tours of at most max_moves moves."""
+    tours = solve_candidate(candidate, max_moves, board)
+    if tours is None:
+        return None
+    return (sum(candidate), format_solution(candidate, tours, board))
+
+
+def count_dfs_nodes(values, start, target, max_moves, board=BOARD):
+    """Number of states the plain depth-first search visits for the same question."""
+    goal = board.goal
+    moves = engine.compile_moves(values, board)
+    count = 0
+
+    def search(sq, score, visited, moves_left):
+        nonlocal count
+        count += 1
+        if moves_left == 0:
+            return
+        for nxt, bit, same, value in moves[sq]:
+            if visited & bit:
+                continue
+            new_score = score + value if same else score * value
+            if new_score > goal or nxt == target:
+                continue
+            search(nxt, new_score, visited | bit, moves_left - 1)
+
+    search(start, values[board.region[start]], 1 << start, max_moves)
+    return count
+
+
+def main():
+    # the plain dfs count gets slow past 14 moves, so compare there by default
+    max_moves = int(sys.argv[1]) if len(sys.argv) > 1 else 14
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 6
+    start, target = BOARD.tours[0]
+
+    # the smallest sums are the hardest candidates: small values allow long tours
+    candidates = [cand for _, level in multithreading.candidates_by_sum() for cand in level][:count]
+
+    print(f"{'candidate':<14} {'dfs states':>12} {'mitm states':>12} {'mitm time':>10}  path")
+    for candidate in candidates:
+        dfs_states = count_dfs_nodes(candidate, start, target, max_moves)
+        stats = {}
+        start_time = time.perf_counter()
+        path = find_path(candidate, start, target, max_moves, stats=stats)
+        elapsed = time.perf_counter() - start_time
+        tour = ",".join(BOARD.square_to_str(sq) for sq in path) if path else "-"
+        print(f"{str(candidate):<14} {dfs_states:>12} {stats['explored']:>12} {elapsed:>9.3f}s  {tour}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,37 +1,44 @@
 
 #!/usr/bin/env python3
 import sys
+import os
+import array
 import itertools
+import collections
 import concurrent.futures
+import multiprocessing
 import time
 
+from board import Board, KNIGHT_MOVES
+from engine import format_solution
+from oracle import Oracle
+
 # Increase recursion limit in case deep search is needed.
 sys.setrecursionlimit(10000)
 
-board = [
-    ['A', 'A', 'A', 'B', 'B', 'C'],  # row0 = a1, b1, c1, d1, e1, f1
-    ['A', 'A', 'A', 'B', 'B', 'C'],  # row1 = a2, b2, c2, d2, e2, f2
-    ['A', 'A', 'B', 'B', 'C', 'C'],  # row2 = a3, b3, c3, d3, e3, f3
-    ['A', 'A', 'B', 'B', 'C', 'C'],  # row3 = a4, b4, c4, d4, e4, f4
-    ['A', 'B', 'B', 'C', 'C', 'C'],  # row4 = a5, b5, c5, d5, e5, f5
-    ['A', 'B', 'B', 'C', 'C', 'C']   # row5 = a6, b6, c6, d6, e6, f6
-]
+# The layout lives in boards/knight6.txt; row0 = a1..f1 up to row5 = a6..f6.
+layout = Board.load()
+board = layout.grid
+rows, cols = layout.rows, layout.cols
 
 # Precompute knight moves
 
 
-knight_moves = [(2, 1), (2, -1), (-2, 1), (-2, -1),
-                (1, 2), (1, -2), (-1, 2), (-1, -2)]
+knight_moves = KNIGHT_MOVES
 neighbors = {}
-for r in range(6):
-    for c in range(6):
+for r in range(rows):
+    for c in range(cols):
         nbrs = []
         for dr, dc in knight_moves:
             nr, nc = r + dr, c + dc
-            if 0 <= nr < 6 and 0 <= nc < 6:
+            if 0 <= nr < rows and 0 <= nc < cols:
                 nbrs.append((nr, nc))
         neighbors[(r, c)] = nbrs
 
+# Square-index view of the board (square = r * cols + c) for the pruning oracle.
+square_neighbors = [[nr * cols + nc for nr, nc in neighbors[divmod(sq, cols)]] for sq in range(layout.num_squares)]
+square_region = [board[sq // cols][sq % cols] for sq in range(layout.num_squares)]
+
 # -----------------------
 # Scoring and DFS functions
 # -----------------------
@@ -48,10 +55,10 @@ def update_score(score, from_pos, to_pos, vals):
     else:
         return score * vals[letter_to]
 
-def dfs(pos, target, score, path, visited, vals):
+def dfs(pos, target, score, path, visited, vals, oracle=None):
     """
     Recursively search for a knight’s path (without revisiting squares) from pos to target.
-    Prune branches where score > 2024.
+    Prune branches where score > 2024, and branches the oracle rejects if one is given.
     """
     if score > 2024:
         return None
@@ -66,9 +73,11 @@ def dfs(pos, target, score, path, visited, vals):
         new_score = update_score(score, pos, nxt, vals)
         if new_score > 2024:
             continue
+        if oracle is not None and not oracle.admits(nxt[0] * cols + nxt[1], new_score):
+            continue
         visited.add(nxt)
         path.append(nxt)
-        result = dfs(nxt, target, new_score, path, visited, vals)
+        result = dfs(nxt, target, new_score, path, visited, vals, oracle)
         if result is not None:
             return result
         path.pop()
@@ -83,7 +92,7 @@ def coord_to_str(pos):
 # -----------------------
 # Candidate search function
 # -----------------------
-def candidate_search(candidate):
+def candidate_search(candidate, use_oracle=True):
 
     A_val, B_val, C_val = candidate
     vals = {'A': A_val, 'B': B_val, 'C': C_val}
@@ -92,7 +101,8 @@ def candidate_search(candidate):
     start1, target1 = (0, 0), (5, 5)
     visited1 = {start1}
     path1 = [start1]
-    sol1 = dfs(start1, target1, vals['A'], path1, visited1, vals)
+    oracle1 = Oracle(vals, target1[0] * cols + target1[1], square_neighbors, square_region, 2024, vals['A']) if use_oracle else None
+    sol1 = dfs(start1, target1, vals['A'], path1, visited1, vals, oracle1)
     if sol1 is None:
         return None
 
@@ -100,7 +110,8 @@ def candidate_search(candidate):
     start2, target2 = (5, 0), (0, 5)
     visited2 = {start2}
     path2 = [start2]
-    sol2 = dfs(start2, target2, vals['A'], path2, visited2, vals)
+    oracle2 = Oracle(vals, target2[0] * cols + target2[1], square_neighbors, square_region, 2024, vals['A']) if use_oracle else None
+    sol2 = dfs(start2, target2, vals['A'], path2, visited2, vals, oracle2)
     if sol2 is None:
         return None
 
@@ -110,39 +121,227 @@ def candidate_search(candidate):
     return (A_val + B_val + C_val, output)
 
 # -----------------------
-# Main function using multiprocessing
+# Minimum-sum-first scheduler
 # -----------------------
-def main():
-    start_time = time.time()
-    candidates = []
-    # Loop over all distinct positive integers A, B, C with A+B+C < 50.
-    for A_val in range(1, 50):
-        for B_val in range(1, 50):
-            if B_val == A_val:
+def candidates_by_sum(max_sum=50, num_values=3):
+    """
+    All tuples of num_values distinct positive integers with sum < max_sum,
+    grouped by sum, smallest first.
+    """
+    levels = {}
+
+    def extend(prefix, total):
+        if len(prefix) == num_values:
+            levels.setdefault(total, []).append(tuple(prefix))
+            return
+        # leave room for the remaining values, each at least 1
+        for value in range(1, max_sum - total - (num_values - len(prefix) - 1)):
+            if value in prefix:
                 continue
-            for C_val in range(1, 50):
-                if C_val == A_val or C_val == B_val:
-                    continue
-                if A_val + B_val + C_val >= 50:
-                    continue
-                candidates.append((A_val, B_val, C_val))
-    
+            prefix.append(value)
+            extend(prefix, total + value)
+            prefix.pop()
+
+    extend([], 0)
+    return sorted(levels.items())
+
+def search_batch(search, batch, deadline=None):
+    """
+    Run search over a batch of candidates inside a worker, returning only the
+    hits. Past deadline (a time.time() value) the rest of the batch is skipped.
+    """
+    results = []
+    for candidate in batch:
+        if deadline is not None and time.time() >= deadline:
+            break
+        res = search(candidate)
+        if res is not None:
+            results.append(res)
+    return results
+
+# -----------------------
+# Shared worker pool
+# -----------------------
+# Worker-side state of the shared pool: the candidate list, the solve function
+# (with its board and tables), the board size and the deadline. Under fork it
+# is inherited from the parent; otherwise every worker receives it once, at
+# start-up.
+shared_state = {}
+
+def init_shared_worker(candidates, solve, num_squares, deadline=None):
+    shared_state["candidates"] = candidates
+    shared_state["solve"] = solve
+    shared_state["num_squares"] = num_squares
+    shared_state["deadline"] = deadline
+
+def solve_range(lo, hi):
+    """
+    Solve candidates[lo:hi] inside a shared-pool worker. Every hit becomes one
+    fixed-size int32 record: the candidate index, then each tour's squares
+    padded with -1 to the board size. Formatting is left to the parent.
+    Past the deadline the rest of the range is skipped.
+    """
+    candidates = shared_state["candidates"]
+    solve = shared_state["solve"]
+    num_squares = shared_state["num_squares"]
+    deadline = shared_state["deadline"]
+    records = array.array('i')
+    for i in range(lo, hi):
+        if deadline is not None and time.time() >= deadline:
+            break
+        tours = solve(candidates[i])
+        if tours is None:
+            continue
+        records.append(i)
+        for tour in tours:
+            records.extend(tour)
+            records.extend([-1] * (num_squares - len(tour)))
+    return records.tobytes()
+
+def decode_records(data, candidates, board):
+    """Turn solve_range records back into (sum, formatted solution) pairs."""
+    records = array.array('i')
+    records.frombytes(data)
+    num_squares = board.num_squares
+    record_size = 1 + len(board.tours) * num_squares
+    results = []
+    for start in range(0, len(records), record_size):
+        candidate = candidates[records[start]]
+        tours = []
+        for t in range(len(board.tours)):
+            tour = records[start + 1 + t * num_squares:start + 1 + (t + 1) * num_squares]
+            tours.append([sq for sq in tour if sq >= 0])
+        results.append((sum(candidate), format_solution(candidate, tours, board)))
+    return results
+
+def schedule(search=candidate_search, max_sum=50, chunk_size=32, max_workers=None, progress_every=1.0,
+             num_values=3, time_budget=None, solve=None, board=None, sum_label="A+B+C"):
+    """
+    Search candidates in increasing A+B+C order, in chunked batches, and stop as
+    soon as the smallest sum with a solution is proven: once a sum level has a
+    solution, batches at that level and above are cancelled, and only the lower
+    levels still in flight are awaited.
+
+    If time_budget (seconds) runs out first, the search stops with the best
+    solution found so far, which is then not proven minimal. Workers check the
+    same deadline between candidates and skip the rest of their batch, so a
+    running batch overruns the budget by at most one candidate's search.
+
+    By default each batch pickles its candidates and the search function, and
+    the worker sends back formatted strings. Passing solve (candidate -> list
+    of tours as square indices, or None) and its board switches to the shared
+    pool: workers get the candidate list, solve and its tables once (inherited
+    through fork where available), batches are just (lo, hi) index ranges, and
+    hits come back as compact int records that are formatted here.
+
+    sum_label names the sum in progress messages (e.g. "+".join(board.letters)).
+
+    Returns (best_sum, best_solution), or (None, None) if nothing was found.
+    """
+    start_time = last_report = time.time()
+    deadline = start_time + time_budget if time_budget is not None else None
+    levels = candidates_by_sum(max_sum, num_values)
+    candidates = [cand for _, cands in levels for cand in cands]
+    batches = []
+    offset = 0
+    for level, cands in levels:
+        for i in range(0, len(cands), chunk_size):
+            batches.append((level, offset + i, offset + min(i + chunk_size, len(cands))))
+        offset += len(cands)
+    remaining = collections.Counter(level for level, _, _ in batches)
+    total = len(candidates)
+    done = 0
     best_sum = float('inf')
     best_solution = None
 
-    # Use a process pool to search candidates in parallel.
-    with concurrent.futures.ProcessPoolExecutor() as executor:
-        # Map candidafe_search over all candidate assignments.
-        results = list(executor.map(candidate_search, candidates))
-        for res in results:
-            if res is not None:
-                current_sum, sol_output = res
-                if current_sum < best_sum:
-                    best_sum = current_sum
-                    best_solution = sol_output
-                    print(f"Found solution with A+B+C = {best_sum}: {sol_output}")
-                    # Optionally, uncomment the next line to stop at the first solution.
-                    # break
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = 4 * max_workers
+    pending = {}
+    next_batch = 0
+
+    if solve is None:
+        executor = concurrent.futures.ProcessPoolExecutor(max_workers)
+
+        def submit(lo, hi):
+            return executor.submit(search_batch, search, candidates[lo:hi], deadline)
+
+        def decode(result):
+            return result
+    else:
+        context = multiprocessing.get_context("fork") if "fork" in multiprocessing.get_all_start_methods() else None
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers, mp_context=context, initializer=init_shared_worker,
+            initargs=(candidates, solve, board.num_squares, deadline))
+
+        def submit(lo, hi):
+            return executor.submit(solve_range, lo, hi)
+
+        def decode(result):
+            return decode_records(result, candidates, board)
+
+    try:
+        while True:
+            # Keep the pool fed, but only with levels that can still beat best_sum.
+            while (next_batch < len(batches) and len(pending) < max_pending
+                   and batches[next_batch][0] < best_sum):
+                level, lo, hi = batches[next_batch]
+                pending[submit(lo, hi)] = (level, hi - lo)
+                next_batch += 1
+
+            # Checked before the pending test: batches cut short by the
+            # deadline must not pass for a finished search.
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    print(f"Time budget of {time_budget:.1f} seconds used up, stopping early.")
+                    break
+            if not pending:
+                break
+            finished, _ = concurrent.futures.wait(pending, timeout=timeout,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                level, size = pending.pop(future)
+                done += size
+                remaining[level] -= 1
+                for current_sum, sol_output in decode(future.result()):
+                    if current_sum < best_sum:
+                        best_sum = current_sum
+                        best_solution = sol_output
+                        print(f"Found solution with {sum_label} = {best_sum}: {sol_output}")
+
+            # Anything at or above best_sum can no longer improve the answer.
+            for future, (level, _) in list(pending.items()):
+                if level >= best_sum:
+                    future.cancel()
+                    del pending[future]
+
+            now = time.time()
+            if now - last_report >= progress_every:
+                open_levels = [level for level, count in remaining.items() if count and level < best_sum]
+                current_level = min(open_levels) if open_levels else best_sum
+                print(f"[{now - start_time:8.1f}s] {done}/{total} candidates done, sum level {current_level}")
+                last_report = now
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        # Running batches stop at the deadline on their own; Python 3.14+
+        # can also kill them outright.
+        terminate_workers = getattr(executor, "terminate_workers", None)
+        if terminate_workers is not None:
+            terminate_workers()
+
+    if best_solution is None:
+        return None, None
+    return best_sum, best_solution
+
+# -----------------------
+# Main function using multiprocessing
+# -----------------------
+def main():
+    start_time = time.time()
+
+    # Use a process pool to search candidates in parallel, smallest A+B+C first.
+    best_sum, best_solution = schedule(candidate_search)
 
     end_time = time.time()
     elapsed = end_time - start_time
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Pruning oracle for the exact 2024 target.
+
+2024 = 2^3 x 11 x 23, so once the last moves of a tour multiply, the score
+before them has to divide 2024 exactly; most scores the search reaches cannot
+be completed at all. For a fixed (A, B, C) the oracle runs the scoring rule
+backwards from (target, 2024) once: stepping back over a same-region move
+subtracts the value, stepping back over a region change divides and needs
+exact divisibility, and nothing below the start score is kept since scores
+never decrease. That marks every (square, score) from which 2024 is still
+reachable by some knight walk. A tour visits every square at most once, so
+the walk back goes breadth first and stops after as many moves as there are
+squares less one: the marked scores then stay within a few thousand per
+square for any goal, instead of growing with it. Walks may revisit squares,
+so the table never rejects a real path; on top of it the oracle checks the
+unvisited squares still leave a way into the target.
+
+Squares are plain ints and the board is passed in as neighbour lists and a
+region per square, so both the bitmask engine and the (r, c) dfs can use it.
+
+usage: python oracle.py [num_candidates]
+"""
+import collections
+import sys
+import time
+
+
+class Oracle:
+    """
+    Decides whether goal is still reachable from (square, score, visited squares).
+
+    table[sq] is the set of scores from which some walk from sq of at most
+    len(neighbors) - 1 moves ends at target with exactly goal, so memory follows the reachable (square, score) pairs
+    rather than goal x squares; low[sq]/high[sq] bound the scores in it.
+    pruned counts how many times admits() said no.
+    """
+
+    def __init__(self, values, target, neighbors, region, goal=2024, min_score=1):
+        self.target = target
+        self.goal = goal
+        self.pruned = 0
+
+        table = [set() for _ in range(len(neighbors))]
+        table[target].add(goal)
+        # breadth first, so every (square, score) is first met by its shortest walk
+        queue = collections.deque([(target, goal, 0)])
+        max_moves = len(neighbors) - 1
+        while queue:
+            sq, need, moves = queue.popleft()
+            if moves == max_moves:
+                continue
+            value = values[region[sq]]
+            for prev in neighbors[sq]:
+                # a tour ends the first time it lands on target
+                if prev == target:
+                    continue
+                if region[prev] == region[sq]:
+                    prev_need = need - value
+                elif need % value:
+                    continue
+                else:
+                    prev_need = need // value
+                if prev_need < min_score or prev_need in table[prev]:
+                    continue
+                table[prev].add(prev_need)
+                queue.append((prev, prev_need, moves + 1))
+
+        self.table = table
+        self.low = []
+        self.high = []
+        for scores in table:
+            self.low.append(min(scores, default=goal + 1))
+            self.high.append(max(scores, default=-1))
+        self.target_mask = sum(1 << sq for sq in neighbors[target])
+
+    def admits(self, sq, score, visited=None):
+        """
+        False if goal can no longer be reached after arriving on sq with score.
+        visited is the bitmask of used squares (including sq), if known.
+        """
+        if score < self.low[sq] or score > self.high[sq] or score not in self.table[sq]:
+            self.pruned += 1
+            return False
+        # every square next to the target is used up and we are not on one of them
+        if (visited is not None and sq != self.target
+                and not self.target_mask & ~visited and not self.target_mask >> sq & 1):
+            self.pruned += 1
+            return False
+        return True
+
+
+def main():
+    import engine
+    import multithreading
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    candidates = [cand for _, level in multithreading.candidates_by_sum() for cand in level]
+    # skip the smallest sums, where the plain dfs takes minutes per candidate
+    candidates = [cand for cand in candidates if sum(cand) >= 25][:count]
+
+    start_time = time.perf_counter()
+    plain = [engine.candidate_search(cand, use_oracle=False) for cand in candidates]
+    plain_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    pruned = [multithreading.candidate_search(cand) for cand in candidates]
+    dfs_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    stats = {}
+    with_oracle = [engine.candidate_search(cand, stats=stats) for cand in candidates]
+    oracle_time = time.perf_counter() - start_time
+
+    # pruning only cuts dead branches, so every search returns the same first path
+    if not plain == pruned == with_oracle:
+        print("MISMATCH between pruned and unpruned searches")
+        sys.exit(1)
+    print(f"{len(candidates)} candidates, {sum(res is not None for res in plain)} solved")
+    print(f"{'engine, no oracle':<22} {plain_time:8.3f} s")
+    print(f"{'dfs + oracle':<22} {dfs_time:8.3f} s")
+    print(f"{'engine + oracle':<22} {oracle_time:8.3f} s  ({stats['pruned']} nodes pruned)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Solve a knight-move scoring puzzle described by a board file.
+
+Finds distinct positive values for the board's regions, with the smallest
+possible sum, such that every tour on the board has a knight path scoring
+exactly the board's goal.
+
+usage: python solve.py [board file] [--workers N] [--time-budget SECONDS]
+                       [--max-sum S] [--method dfs|mitm] [--max-moves M]
+                       [--chunk-size K] [--pickle-tasks]
+"""
+import argparse
+import functools
+import time
+
+import engine
+import mitm
+import multithreading
+from board import Board, DEFAULT_BOARD_FILE
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("board", nargs="?", default=DEFAULT_BOARD_FILE,
+                        help="board file, text or .json (default: boards/knight6.txt)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: one per CPU)")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="stop after this many seconds with the best solution so far")
+    parser.add_argument("--max-sum", type=int, default=50,
+                        help="only try values whose sum is below this (default: 50)")
+    parser.add_argument("--method", choices=("dfs", "mitm"), default="dfs",
+                        help="dfs: bitmask search with the pruning oracle; "
+                             "mitm: meet-in-the-middle, tours limited to --max-moves")
+    parser.add_argument("--max-moves", type=int, default=mitm.DEFAULT_MAX_MOVES,
+                        help="longest tour considered by --method mitm")
+    parser.add_argument("--chunk-size", type=int, default=32,
+                        help="candidates per batch sent to a worker")
+    parser.add_argument("--pickle-tasks", action="store_true",
+                        help="send every batch's candidates and search function to the workers "
+                             "instead of sharing them once")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    board = Board.load(args.board)
+    print(f"{args.board}: {board.rows}x{board.cols}, regions {''.join(board.letters)}, "
+          f"{len(board.tours)} tours, goal {board.goal}")
+
+    if args.method == "mitm":
+        solve = functools.partial(mitm.solve_candidate, max_moves=args.max_moves, board=board)
+        search = functools.partial(mitm.candidate_search, max_moves=args.max_moves, board=board)
+    else:
+        solve = functools.partial(engine.solve_candidate, board=board)
+        search = functools.partial(engine.candidate_search, board=board)
+
+    sum_label = "+".join(board.letters)
+    start_time = time.time()
+    if args.pickle_tasks:
+        best_sum, best_solution = multithreading.schedule(
+            search, max_sum=args.max_sum, chunk_size=args.chunk_size, max_workers=args.workers,
+            num_values=board.num_regions, time_budget=args.time_budget, sum_label=sum_label)
+    else:
+        best_sum, best_solution = multithreading.schedule(
+            max_sum=args.max_sum, chunk_size=args.chunk_size, max_workers=args.workers,
+            num_values=board.num_regions, time_budget=args.time_budget, solve=solve, board=board,
+            sum_label=sum_label)
+
+    print(f"Elapsed time: {time.time() - start_time:.2f} seconds")
+    if best_solution is None:
+        print("No solution found.")
+    else:
+        print("Final solution:")
+        print(best_solution)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Count-state engine for robot baseball style games.
+
+A plate appearance is a walk through (balls, strikes) counts. At every count
+the pitcher throws a strike with probability x and the batter swings with
+probability y; at the mixed equilibrium x = y. Outcomes:
+
+    ball, take        -> (b + 1, s)
+    ball, swing       -> (b, s + 1)
+    strike, take      -> (b, s + 1)
+    strike, swing     -> home run with probability p, else (b, s + 1)
+
+Reaching the ball limit is a walk, reaching the strike limit an out. The
+payoffs of walk, out and home run are configurable (Payoffs), and q is the
+probability of reaching a target count (by default the full count).
+
+The counts form a DAG in which every state on the diagonal b + s = d only
+depends on diagonal d + 1. CountGame builds that DAG once, as index arrays per
+diagonal, and evaluate() sweeps the diagonals backwards doing one set of array
+operations per diagonal, vectorized over the states of the diagonal and over a
+whole batch of p values.
+
+usage: python engine.py [balls] [strikes] [num_points]
+"""
+import collections
+import sys
+import time
+
+import numpy as np
+
+Payoffs = collections.namedtuple("Payoffs", ["walk", "out", "home_run"])
+
+DEFAULT_PAYOFFS = Payoffs(walk=1.0, out=0.0, home_run=4.0)
+
+
+class CountGame:
+    """
+    A count game with balls x strikes limits.
+
+    Tables are indexed by count: evtable[b, s] is the value of count (b, s) and
+    xtable[b, s] the equilibrium strike / swing probability there, for
+    0 <= b <= balls and 0 <= s <= strikes (counts on the limits are terminal).
+    """
+
+    def __init__(self, balls=4, strikes=3, payoffs=DEFAULT_PAYOFFS, target=None, start=(0, 0)):
+        if balls < 1 or strikes < 1:
+            raise ValueError("ball and strike limits must be positive")
+        self.balls = balls
+        self.strikes = strikes
+        self.payoffs = Payoffs(*payoffs)
+        self.target = (balls - 1, strikes - 1) if target is None else tuple(target)
+        self.start = tuple(start)
+        for name, (b, s) in (("target", self.target), ("start", self.start)):
+            if not (0 <= b < balls and 0 <= s < strikes):
+                raise ValueError(f"{name} count {(b, s)} is not a live count")
+
+        # counts are stored flat, slot = b * (strikes + 1) + s
+        self.shape = (balls + 1, strikes + 1)
+        self.num_slots = self.shape[0] * self.shape[1]
+        self.walk_slots = np.array([self.slot(balls, s) for s in range(strikes)], dtype=np.intp)
+        self.out_slots = np.array([self.slot(b, strikes) for b in range(balls)], dtype=np.intp)
+
+        # live counts grouped by diagonal, last diagonal first: (slots, ball successors, strike successors)
+        self.levels = []
+        for d in range(balls + strikes - 2, -1, -1):
+            counts = [(b, d - b) for b in range(max(0, d - strikes + 1), min(balls - 1, d) + 1)]
+            self.levels.append((
+                d,
+                np.array([self.slot(b, s) for b, s in counts], dtype=np.intp),
+                np.array([self.slot(b + 1, s) for b, s in counts], dtype=np.intp),
+                np.array([self.slot(b, s + 1) for b, s in counts], dtype=np.intp),
+            ))
+
+        self._buffers = None
+
+    def slot(self, b, s):
+        return b * self.shape[1] + s
+
+    def buffers(self, n):
+        """
+        Value, strategy and reach arrays for a batch of n p values, with the
+        terminal payoffs already in place. Only the largest batch so far is
+        allocated; smaller batches get views of its first n columns.
+        """
+        if self._buffers is None or self._buffers[0].shape[1] < n:
+            values = np.zeros((self.num_slots, n))
+            values[self.walk_slots] = self.payoffs.walk
+            values[self.out_slots] = self.payoffs.out
+            self._buffers = (values, np.zeros((self.num_slots, n)), np.zeros((self.num_slots, n)))
+        return tuple(buffer[:, :n] for buffer in self._buffers)
+
+    def evaluate(self, p):
+        """
+        Solve the game for an array of p values.
+
+        Returns (q, evtable, xtable) like main.dp_batch: q has the shape of p and
+        the tables have shape (balls + 1, strikes + 1) + p.shape. The tables are
+        views of the engine's buffers and are overwritten by the next evaluate();
+        copy them to keep them.
+        """
+        shape = np.shape(p)
+        p = np.asarray(p, dtype=float).reshape(1, -1)
+        values, xs, reach = self.buffers(p.shape[1])
+        home_run = self.payoffs.home_run * p
+
+        for _, slots, ball_slots, strike_slots in self.levels:
+            nextBall = values[ball_slots]
+            nextStrike = values[strike_slots]
+
+            hit = home_run + (1 - p) * nextStrike
+            denom = nextBall + hit - 2 * nextStrike
+            # degenerate case as in dp: no mixing when all payoffs are equal
+            bad = np.abs(denom) < 1e-10
+            degenerate = bad.any()
+            if degenerate:
+                denom[bad] = 1.0
+
+            x = (nextBall - nextStrike) / denom
+            ev = (nextBall * hit - nextStrike * nextStrike) / denom
+            if degenerate:
+                x[bad] = 0.0
+                ev[bad] = nextBall[bad]
+
+            values[slots] = ev
+            xs[slots] = x
+
+        # probability of reaching the target: 1 there, 0 on every terminal and
+        # on every other count of the target's diagonal or later
+        target_diagonal = sum(self.target)
+        reach.fill(0.0)
+        reach[self.slot(*self.target)] = 1.0
+        for d, slots, ball_slots, strike_slots in self.levels:
+            if d >= target_diagonal:
+                continue
+            x = xs[slots]
+            a = x * (2 - x * (1 + p))
+            b = (1 - x)**2
+            reach[slots] = a * reach[strike_slots] + b * reach[ball_slots]
+
+        q = reach[self.slot(*self.start)].copy()
+        table_shape = self.shape + shape
+        return q.reshape(shape), values.reshape(table_shape), xs.reshape(table_shape)
+
+    def evaluate_grad(self, p):
+        """
+        q and dq/dp for an array of p values, both with the shape of p.
+
+        Forward-mode differentiation: every value, strategy and reach
+        probability carries its derivative with respect to p through the same
+        sweep as evaluate().
+        """
+        shape = np.shape(p)
+        p = np.asarray(p, dtype=float).reshape(1, -1)
+        n = p.shape[1]
+        values, xs, reach = (np.zeros((self.num_slots, n)) for _ in range(3))
+        dvalues, dxs, dreach = (np.zeros((self.num_slots, n)) for _ in range(3))
+        values[self.walk_slots] = self.payoffs.walk
+        values[self.out_slots] = self.payoffs.out
+        home_run = self.payoffs.home_run
+
+        for _, slots, ball_slots, strike_slots in self.levels:
+            nextBall, dnextBall = values[ball_slots], dvalues[ball_slots]
+            nextStrike, dnextStrike = values[strike_slots], dvalues[strike_slots]
+
+            hit = home_run * p + (1 - p) * nextStrike
+            dhit = home_run - nextStrike + (1 - p) * dnextStrike
+            denom = nextBall + hit - 2 * nextStrike
+            ddenom = dnextBall + dhit - 2 * dnextStrike
+            bad = np.abs(denom) < 1e-10
+            degenerate = bad.any()
+            if degenerate:
+                denom[bad] = 1.0
+
+            x = (nextBall - nextStrike) / denom
+            dx = (dnextBall - dnextStrike - x * ddenom) / denom
+            ev = (nextBall * hit - nextStrike * nextStrike) / denom
+            dev = (dnextBall * hit + nextBall * dhit - 2 * nextStrike * dnextStrike - ev * ddenom) / denom
+            if degenerate:
+                x[bad] = dx[bad] = 0.0
+                ev[bad] = nextBall[bad]
+                dev[bad] = dnextBall[bad]
+
+            values[slots], dvalues[slots] = ev, dev
+            xs[slots], dxs[slots] = x, dx
+
+        target_diagonal = sum(self.target)
+        reach[self.slot(*self.target)] = 1.0
+        for d, slots, ball_slots, strike_slots in self.levels:
+            if d >= target_diagonal:
+                continue
+            x, dx = xs[slots], dxs[slots]
+            a = x * (2 - x * (1 + p))
+            da = 2 * dx * (1 - x * (1 + p)) - x * x
+            b = (1 - x)**2
+            db = -2 * (1 - x) * dx
+            reach[slots] = a * reach[strike_slots] + b * reach[ball_slots]
+            dreach[slots] = (da * reach[strike_slots] + a * dreach[strike_slots]
+                             + db * reach[ball_slots] + b * dreach[ball_slots])
+
+        start = self.slot(*self.start)
+        return reach[start].reshape(shape), dreach[start].reshape(shape)
+
+
+def main():
+
+    balls = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    strikes = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    num_points = int(sys.argv[3]) if len(sys.argv) > 3 else 10**4
+
+    game = CountGame(balls, strikes)
+    print(f"{balls} balls x {strikes} strikes: {sum(len(level[1]) for level in game.levels)} live counts "
+          f"on {len(game.levels)} diagonals, target {game.target}")
+
+    prange = np.linspace(0.01, 0.99, num_points)
+    start = time.perf_counter()
+    qvals, _, _ = game.evaluate(prange)
+    elapsed = time.perf_counter() - start
+
+    imax = np.argmax(qvals)
+    print(f"{num_points} p values in {1e3 * elapsed:.1f} ms")
+    print(f"qbest = {qvals[imax]}")
+    print(f"pbest = {prange[imax]}")
+
+    if (balls, strikes) == (4, 3):
+        from main import dp_batch
+
+        q, _, _ = dp_batch(prange)
+        print(f"max difference from main.dp_batch: {np.max(np.abs(q - qvals)):.3g}")
+
+
+if __name__ == "__main__":
+    main()
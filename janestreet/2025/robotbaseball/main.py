@@ -1,5 +1,8 @@
 import numpy as np
 import sys # to get kwargs
+import time
+
+from recorder import RunRecorder
 
 
 # given some p, and some tensor of probabilities that pitchers and batters at some point 
@@ -61,7 +64,13 @@ def dp(p):
                 nextBall = evtable[b + 1][s]
                 nextStrike = evtable[b][s + 1]
 
-                y = 1 - nextStrike / (2 * nextStrike - nextBall + 4*p)
+                denom = nextBall + 4 * p - nextStrike * (1 + p)
+
+                if abs(denom) < 1e-10:
+                    # degenerate case, all payoffs equal
+                    y = 0.0
+                else:
+                    y = (nextBall - nextStrike) / denom
                 x = y
 
                 evtable[b][s] = ((1 - x)**2) * nextBall + 2 * x * (1 - x) * nextStrike + (x**2)*(4*p + (1 - p)*nextStrike) 
@@ -72,49 +81,142 @@ def dp(p):
     return q
 
 
-def main():
+# -----------------------
+# Vectorized over p
+# -----------------------
+# Same recursions as getQ / dp, but every table entry carries a trailing p axis,
+# so one pass over the 5 x 4 count states evaluates q for a whole array of p.
+
+# p values per dp_batch call in scan(), small enough for the tables to stay in cache
+SCAN_BLOCK = 16384
 
-    log = {}
 
+def getQ_batch(xtable, p):
     """
-    try: 
-        iterations = int(sys.argv[1])
-    except Exception as e:
-        iterations = 1
-        raise e
+    Vectorized getQ. xtable has shape (5, 4) + p.shape, returns q with p's shape.
+    """
+    qtable = np.zeros(xtable.shape)
+    qtable[3, 2] = 1.0
+
+    for balls in range(3, -1, -1):
+        for strikes in range(2, -1, -1):
+            if balls == 3 and strikes == 2:
+                continue
+
+            x = xtable[balls, strikes]
+            # x^2 (1 - p) + 2x(1 - x) and (1 - x)^2
+            a = x * (2 - x * (1 + p))
+            b = (1 - x)**2
 
+            qtable[balls, strikes] = a * qtable[balls, strikes + 1] + b * qtable[balls + 1, strikes]
 
+    return qtable[0, 0]
+
+
+def dp_batch(p):
     """
-    iterations = 1
-    l , h = 0.0 , 1.0
+    Vectorized dp over an array of p values.
+
+    Returns (q, evtable, xtable): q has the shape of p, the tables have shape
+    (5, 4) + p.shape, i.e. evtable[b, s] is the array of values of state (b, s).
+
+    Each count is a 2x2 game with payoffs nextBall, nextStrike, nextStrike and
+    hit = 4p + (1 - p) nextStrike, so its value has the closed form
+    (nextBall * hit - nextStrike^2) / denom, the same denom as the mixing
+    probability x. That is what dp computes, in a few array passes per state.
+    """
+    shape = np.shape(p)
+    p = np.asarray(p, dtype=float).reshape(-1)
+    evtable = np.zeros((5, 4) + p.shape)
+    xtable = np.zeros((5, 4) + p.shape)
+
+    # four balls is a walk worth 1, three strikes an out worth 0
+    evtable[4, :3] = 1.0
+
+    for b in range(3, -1, -1):
+        for s in range(2, -1, -1):
+            nextBall = evtable[b + 1, s]
+            nextStrike = evtable[b, s + 1]
 
-    qvals = np.zeros(10)
+            hit = 4 * p + (1 - p) * nextStrike
+            denom = nextBall + hit - 2 * nextStrike
+            # degenerate case as in dp: no mixing when all payoffs are equal
+            bad = np.abs(denom) < 1e-10
+            degenerate = bad.any()
+            if degenerate:
+                denom[bad] = 1.0
 
-    for i in range(iterations): 
-        print("entered iteration loop")
-        # build new range for prange
+            x = xtable[b, s]
+            np.divide(nextBall - nextStrike, denom, out=x)
 
-        prange = np.arange(l, h, (h - l) / 10.0)
-        print(prange)
+            ev = evtable[b, s]
+            np.divide(nextBall * hit - nextStrike * nextStrike, denom, out=ev)
 
-        for i , pval in enumerate(prange):
-            print("entered pval loop")
-            qvals[i] = dp(pval)
+            if degenerate:
+                x[bad] = 0.0
+                ev[bad] = nextBall[bad]
 
-            print(f"got q = {qvals[i]}")
-            log[pval] = qvals[i]
+    q = getQ_batch(xtable, p)
 
-        
-        
+    return q.reshape(shape), evtable.reshape((5, 4) + shape), xtable.reshape((5, 4) + shape)
+
+
+def scan(l, h, num_points, block=SCAN_BLOCK, recorder=None):
+    """
+    Evaluate q on num_points evenly spaced p in [l, h]. Returns (prange, qvals).
+
+    The grid goes through dp_batch a block at a time, so the tables stay in
+    cache instead of taking 2 x 160 bytes per point. If a recorder.RunRecorder
+    is given, every block's p, q and tables are recorded.
+    """
+    prange = np.linspace(l, h, num_points)
+    qvals = np.empty(num_points)
+    for lo in range(0, num_points, block):
+        qvals[lo:lo + block], evtable, xtable = dp_batch(prange[lo:lo + block])
+        if recorder is not None:
+            recorder.record(prange[lo:lo + block], qvals[lo:lo + block], evtable, xtable)
+    return prange, qvals
+
+
+def main():
+
+    try:
+        num_points = int(sys.argv[1])
+    except (IndexError, ValueError):
+        num_points = 10**6
+
+    try:
+        iterations = int(sys.argv[2])
+    except (IndexError, ValueError):
+        iterations = 2
+
+    # every evaluation goes to one run file, plot it with recorder.plot_run
+    run_file = sys.argv[3] if len(sys.argv) > 3 else None
+    recorder = RunRecorder(run_file) if run_file is not None else None
+
+    # q jumps to 1 at the degenerate p = 0, stay clear of the endpoints
+    l , h = 0.01 , 0.99
+
+    for i in range(iterations):
+        start = time.perf_counter()
+        prange, qvals = scan(l, h, num_points, recorder=recorder)
+        elapsed = time.perf_counter() - start
 
         imax = np.argmax(qvals)
-        # zoom in
-        l = prange[imax] - ((l - h) / 10.0)
-        h = prange[imax] + ((l - h) / 10.0)
+        print(f"iteration {i}: {num_points} p in [{l:.12f}, {h:.12f}] in {1e3 * elapsed:.1f} ms, "
+              f"best p = {prange[imax]:.12f}, q = {qvals[imax]:.12f}")
+
+        # zoom in to the grid cells on either side of the best point
+        step = (h - l) / (num_points - 1)
+        l = max(0.01, prange[imax] - step)
+        h = min(0.99, prange[imax] + step)
 
+    if recorder is not None:
+        recorder.close()
+        print(f"recorded {recorder.rows} evaluations to {run_file}")
 
-    print("Finalized. Log of run is as follows: ")
-    print(log)
+    print(f"qbest = {qvals[imax]}")
+    print(f"pbest = {prange[imax]}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""
+Maximize q(p) with derivative information.
+
+CountGame.evaluate_grad gives q and dq/dp in one sweep (forward-mode through
+the DP recursion), so the maximum is a root of dq/dp:
+
+  1. bracket: one batched sweep over a coarse grid of p, keeping the grid
+     cell around the best point where dq/dp changes sign (halving towards
+     lo or hi if the best point is the first or last one and q still
+     increases that way),
+  2. refine: secant steps on dq/dp inside the bracket (Illinois regula falsi),
+     until the bracket is narrower than the requested precision.
+
+Every evaluation is counted, so callers see what the precision cost.
+
+usage: python optimize.py [tol]
+"""
+import collections
+import sys
+import time
+
+import numpy as np
+
+from engine import CountGame
+
+Optimum = collections.namedtuple("Optimum", ["p", "q", "dq", "bracket", "evals"])
+
+
+def maximize(game=None, tol=1e-12, lo=0.0, hi=1.0, grid=4, max_evals=100):
+    """
+    Find the p in (lo, hi) maximizing the game's q to within tol.
+
+    Returns an Optimum(p, q, dq, bracket, evals): bracket is the final (left,
+    right) interval known to contain the maximum, evals the number of values
+    of p evaluated: the grid points of the bracketing sweep (computed in one
+    batched call) plus one per step after it, at most max_evals in all. The
+    ends lo and hi themselves are never evaluated (q is degenerate at p = 0);
+    if q still increases towards one of them when max_evals or tol is
+    reached, the best point is returned with the bracket reaching that end.
+    """
+    if grid >= max_evals:
+        raise ValueError(f"grid ({grid}) must be smaller than max_evals ({max_evals})")
+    game = CountGame() if game is None else game
+
+    # -----------------------
+    # Bracketing
+    # -----------------------
+    ps = np.linspace(lo, hi, grid + 2)[1:-1]
+    qs, dqs = game.evaluate_grad(ps)
+    evals = grid
+
+    i = int(np.argmax(qs))
+    best = (float(ps[i]), float(qs[i]), float(dqs[i]))
+    if dqs[i] == 0.0:
+        return Optimum(*best, (best[0], best[0]), evals)
+    j = i + 1 if dqs[i] > 0 else i - 1
+    if 0 <= j < grid:
+        other = (float(ps[j]), float(dqs[j]))
+    else:
+        # q still increases towards an end: halve the distance to it until
+        # dq/dp turns
+        end = hi if j == grid else lo
+        while True:
+            if evals >= max_evals or abs(end - best[0]) <= tol:
+                return Optimum(*best, tuple(sorted((best[0], end))), evals)
+            nxt = (best[0] + end) / 2
+            qn, dn = game.evaluate_grad(nxt)
+            qn, dn = float(qn), float(dn)
+            evals += 1
+            if dn == 0.0:
+                return Optimum(nxt, qn, dn, (nxt, nxt), evals)
+            if (dn > 0) != (best[2] > 0):
+                other = (nxt, dn)
+                break
+            best = (nxt, qn, dn)
+    (left, dleft), (right, dright) = sorted([(best[0], best[2]), other])
+
+    # -----------------------
+    # Refinement: regula falsi on dq/dp, Illinois variant
+    # -----------------------
+    # The secant through the bracket ends is a Newton step with the second
+    # derivative estimated from the two gradients. When the same end survives
+    # twice in a row its gradient is halved, so both ends keep moving and the
+    # bracket shrinks superlinearly.
+    side = 0
+    while right - left > tol and evals < max_evals:
+        nxt = right - dright * (right - left) / (dright - dleft)
+        if not left < nxt < right:
+            nxt = (left + right) / 2
+
+        qn, dn = game.evaluate_grad(nxt)
+        qn, dn = float(qn), float(dn)
+        evals += 1
+        # q is flat to rounding near the top, the gradient still resolves it
+        if abs(dn) <= abs(best[2]):
+            best = (nxt, qn, dn)
+
+        if dn == 0.0:
+            left = right = nxt
+        elif dn > 0:
+            left, dleft = nxt, dn
+            if side == 1:
+                dright /= 2
+            side = 1
+        else:
+            right, dright = nxt, dn
+            if side == -1:
+                dleft /= 2
+            side = -1
+
+    return Optimum(*best, (left, right), evals)
+
+
+def main():
+
+    tol = float(sys.argv[1]) if len(sys.argv) > 1 else 1e-12
+    grid = 4
+
+    start = time.perf_counter()
+    opt = maximize(tol=tol, grid=grid)
+    elapsed = time.perf_counter() - start
+
+    print(f"maximize(tol={tol:g}): {opt.evals} evaluations ({grid} grid points, "
+          f"{opt.evals - grid} steps after them) in {1e3 * elapsed:.2f} ms")
+    print(f"bracket = [{opt.bracket[0]:.15f}, {opt.bracket[1]:.15f}]")
+    print(f"qbest = {opt.q}")
+    print(f"pbest = {opt.p}")
+    print(f"dq/dp = {opt.dq:.3g}")
+
+    try:
+        from scipy.optimize import minimize_scalar
+    except ImportError:
+        return
+
+    # the notebook's way, for comparison
+    from main import dp
+
+    result = minimize_scalar(lambda p: -dp(p), bounds=(0.00, 1), method='bounded', options={'xatol': tol})
+    print(f"minimize_scalar: {result.nfev} evaluations, p = {result.x}, q = {-result.fun}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Arbitrary-precision and interval backends for the count game, with a
+certified optimum.
+
+float64 (CountGame.evaluate / evaluate_grad) is what scans and the optimizer
+use. Here the same forward-mode sweep runs in an mpmath context instead:
+
+  mp  - multiprecision floats at any number of digits,
+  iv  - mpmath interval arithmetic: every quantity is an interval guaranteed
+        to contain the exact value, rounding included.
+
+certify() pays for those only near the optimum: the float optimizer finds the
+maximum, a few secant steps in mp polish it, and an interval sweep proves that
+dq/dp changes sign across a tiny bracket and encloses q at the maximum. The
+float guard for a vanishing denominator has no rigorous counterpart, so the
+interval sweep refuses (ValueError) if a denominator interval contains 0.
+
+usage: python precise.py [digits]
+"""
+import collections
+import contextlib
+import sys
+import time
+
+from mpmath import iv, mp
+
+from engine import CountGame
+from optimize import maximize
+
+Certificate = collections.namedtuple("Certificate", ["p", "q", "p_bounds", "q_bounds", "dps", "evals"])
+
+
+@contextlib.contextmanager
+def workdps(ctx, dps):
+    """ctx.workdps for both contexts (mpmath.iv has none)."""
+    saved = ctx.dps
+    ctx.dps = dps
+    try:
+        yield
+    finally:
+        ctx.dps = saved
+
+
+def sweep(game, p, ctx):
+    """
+    q and dq/dp of game at a single p, computed in the mpmath context ctx
+    (mpmath.mp or mpmath.iv). p may be anything ctx.mpf accepts, for iv also an
+    interval [a, b], in which case the results enclose q and dq/dp on all of it.
+    """
+    interval = ctx is iv
+    p = ctx.mpf(p)
+    zero = ctx.mpf(0)
+    values = [zero] * game.num_slots
+    dvalues = [zero] * game.num_slots
+    xs = [zero] * game.num_slots
+    dxs = [zero] * game.num_slots
+    for slot in game.walk_slots:
+        values[slot] = ctx.mpf(game.payoffs.walk)
+    for slot in game.out_slots:
+        values[slot] = ctx.mpf(game.payoffs.out)
+    home_run = ctx.mpf(game.payoffs.home_run)
+
+    for _, slots, ball_slots, strike_slots in game.levels:
+        for slot, ball, strike in zip(slots.tolist(), ball_slots.tolist(), strike_slots.tolist()):
+            nextBall, dnextBall = values[ball], dvalues[ball]
+            nextStrike, dnextStrike = values[strike], dvalues[strike]
+
+            hit = home_run * p + (1 - p) * nextStrike
+            dhit = home_run - nextStrike + (1 - p) * dnextStrike
+            denom = nextBall + hit - 2 * nextStrike
+            ddenom = dnextBall + dhit - 2 * dnextStrike
+
+            if interval:
+                if 0 in denom:
+                    raise ValueError(f"denominator interval {denom} contains 0")
+            elif abs(denom) < 1e-10:
+                # degenerate case as in dp
+                values[slot], dvalues[slot] = nextBall, dnextBall
+                xs[slot] = dxs[slot] = zero
+                continue
+
+            x = (nextBall - nextStrike) / denom
+            ev = (nextBall * hit - nextStrike * nextStrike) / denom
+            values[slot] = ev
+            dvalues[slot] = (dnextBall * hit + nextBall * dhit - 2 * nextStrike * dnextStrike - ev * ddenom) / denom
+            xs[slot] = x
+            dxs[slot] = (dnextBall - dnextStrike - x * ddenom) / denom
+
+    reach = [zero] * game.num_slots
+    dreach = [zero] * game.num_slots
+    reach[game.slot(*game.target)] = ctx.mpf(1)
+    target_diagonal = sum(game.target)
+    for d, slots, ball_slots, strike_slots in game.levels:
+        if d >= target_diagonal:
+            continue
+        for slot, ball, strike in zip(slots.tolist(), ball_slots.tolist(), strike_slots.tolist()):
+            x, dx = xs[slot], dxs[slot]
+            a = x * (2 - x * (1 + p))
+            da = 2 * dx * (1 - x * (1 + p)) - x * x
+            b = (1 - x)**2
+            db = -2 * (1 - x) * dx
+            reach[slot] = a * reach[strike] + b * reach[ball]
+            dreach[slot] = da * reach[strike] + a * dreach[strike] + db * reach[ball] + b * dreach[ball]
+
+    start = game.slot(*game.start)
+    return reach[start], dreach[start]
+
+
+def evaluate(p, game=None, dps=None, interval=False):
+    """
+    q and dq/dp at p with a selectable backend: float64 if dps is None, else
+    mpmath at dps digits, as intervals if interval is set.
+    """
+    game = CountGame() if game is None else game
+    if dps is None:
+        q, dq = game.evaluate_grad(p)
+        return float(q), float(dq)
+    ctx = iv if interval else mp
+    with workdps(ctx, dps):
+        return sweep(game, p, ctx)
+
+
+def certify(game=None, dps=40, radius=None, max_steps=20):
+    """
+    Maximize q(p) and prove the result.
+
+    Returns a Certificate(p, q, p_bounds, q_bounds, dps, evals): the maximizer
+    lies in p_bounds and the maximum value in q_bounds, both checked with
+    interval arithmetic at dps digits. radius is the half-width of p_bounds
+    (default 10^(10 - dps)); it is widened if the sign check is inconclusive.
+    The float pass decides which local maximum is certified.
+    """
+    game = CountGame() if game is None else game
+
+    # -----------------------
+    # float64 pass
+    # -----------------------
+    opt = maximize(game)
+    evals = opt.evals
+
+    # -----------------------
+    # mp polish: secant on dq/dp
+    # -----------------------
+    with workdps(mp, dps):
+        p0, p1 = mp.mpf(opt.bracket[0]), mp.mpf(opt.bracket[1])
+        if p0 == p1:
+            p1 = p0 + mp.mpf(1e-12)
+        d0 = sweep(game, p0, mp)[1]
+        d1 = sweep(game, p1, mp)[1]
+        evals += 2
+        for _ in range(max_steps):
+            if d1 == d0:
+                break
+            p2 = p1 - d1 * (p1 - p0) / (d1 - d0)
+            p0, d0 = p1, d1
+            p1, d1 = p2, sweep(game, p2, mp)[1]
+            evals += 1
+            if abs(p1 - p0) < mp.mpf(10) ** (2 - dps):
+                break
+        pm = p1
+        radius = mp.mpf(10) ** (10 - dps) if radius is None else mp.mpf(radius)
+
+    # -----------------------
+    # interval proof
+    # -----------------------
+    with workdps(iv, dps):
+        while True:
+            with workdps(mp, dps):
+                pl, ph = pm - radius, pm + radius
+            dl = sweep(game, pl, iv)[1]
+            dh = sweep(game, ph, iv)[1]
+            evals += 2
+            if dl.a > 0 and dh.b < 0:
+                break
+            if radius > 1e-6:
+                raise ValueError(f"could not certify a maximum near p = {mp.nstr(pm, 17)}")
+            radius *= 1000
+
+        # q is maximal somewhere in [pl, ph]; by the mean value theorem
+        # q* <= q(pm) + dq([pl, ph]) * ([pl, ph] - pm), and q* >= q(pm)
+        qm = sweep(game, pm, iv)[0]
+        dq_range = sweep(game, [pl, ph], iv)[1]
+        evals += 2
+        upper = qm + dq_range * (iv.mpf([pl, ph]) - pm)
+
+    with workdps(mp, dps):
+        q_bounds = (mp.mpf(qm.a), mp.mpf(upper.b))
+        return Certificate(pm, (q_bounds[0] + q_bounds[1]) / 2, (pl, ph), q_bounds, dps, evals)
+
+
+def main():
+
+    dps = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+
+    start = time.perf_counter()
+    cert = certify(dps=dps)
+    elapsed = time.perf_counter() - start
+
+    with workdps(mp, dps):
+        print(f"certified at {dps} digits in {1e3 * elapsed:.1f} ms, {cert.evals} evaluations")
+        print(f"p in [{mp.nstr(cert.p_bounds[0], dps)}, {mp.nstr(cert.p_bounds[1], dps)}]")
+        print(f"q in [{mp.nstr(cert.q_bounds[0], dps)}, {mp.nstr(cert.q_bounds[1], dps)}]")
+        print(f"q error bound = {mp.nstr((cert.q_bounds[1] - cert.q_bounds[0]) / 2, 3)}")
+        print(f"qbest = {mp.nstr(cert.q, dps - 5)}")
+        print(f"pbest = {mp.nstr(cert.p, dps - 15)}")
+
+
+if __name__ == "__main__":
+    main()
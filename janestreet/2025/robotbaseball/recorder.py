@@ -0,0 +1,191 @@
+"""
+Run recorder: every evaluated (p, q, evtable, xtable) appended to one
+columnar file, plots rendered from that file on demand.
+
+Columns are p, q, ev_<b>_<s> and x_<b>_<s> for every count (b, s). Rows are
+buffered in memory and written a block at a time:
+
+  .parquet  - one row group per block (needs pyarrow),
+  .npz      - one structured array per block, each a block_<i>.npy member
+              added to the zip as it is written (numpy only), so the file is
+              a regular npz that np.load reads too.
+
+usage: python recorder.py <run file> [num_points] [plot file]
+       records a dense scan of q(p) and optionally renders it
+"""
+import sys
+import time
+import zipfile
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def default_run_path(name):
+    """name.parquet if pyarrow is available, else name.npz."""
+    return name + (".parquet" if pyarrow is not None else ".npz")
+
+
+def column_names(shape):
+    cells = [f"{b}_{s}" for b in range(shape[0]) for s in range(shape[1])]
+    return ["p", "q"] + [f"ev_{cell}" for cell in cells] + [f"x_{cell}" for cell in cells]
+
+
+class RunRecorder:
+    """
+    Appends evaluations to a run file. Use as a context manager, or call
+    close() to write the last block.
+    """
+
+    def __init__(self, path, shape=(5, 4), buffer_rows=1 << 16):
+        self.path = path
+        self.shape = tuple(shape)
+        self.buffer_rows = buffer_rows
+        self.columns = column_names(self.shape)
+        self.rows = 0
+        self._buffer = []
+        self._buffered = 0
+        self._blocks = 0
+
+        if path.endswith(".parquet"):
+            if pyarrow is None:
+                raise ImportError("writing .parquet runs needs pyarrow, use a .npz run file instead")
+            schema = pyarrow.schema([(name, pyarrow.float64()) for name in self.columns])
+            self._writer = pyarrow.parquet.ParquetWriter(path, schema)
+            self._zip = None
+        else:
+            self._writer = None
+            self._zip = zipfile.ZipFile(path, "w")
+
+    def record(self, p, q, evtable, xtable):
+        """
+        Buffer one batch: p and q of any shape, tables of shape
+        self.shape + p.shape (as dp_batch and CountGame.evaluate return them).
+        """
+        p = np.asarray(p, dtype=float).reshape(-1)
+        cells = self.shape[0] * self.shape[1]
+        block = np.empty((len(p), len(self.columns)))
+        block[:, 0] = p
+        block[:, 1] = np.asarray(q).reshape(-1)
+        block[:, 2:2 + cells] = np.asarray(evtable).reshape(cells, -1).T
+        block[:, 2 + cells:] = np.asarray(xtable).reshape(cells, -1).T
+        self._buffer.append(block)
+        self._buffered += len(p)
+        if self._buffered >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        block = np.concatenate(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+        self.rows += len(block)
+
+        if self._writer is not None:
+            table = pyarrow.table({name: block[:, i] for i, name in enumerate(self.columns)})
+            self._writer.write_table(table)
+        else:
+            dtype = np.dtype([(name, np.float64) for name in self.columns])
+            with self._zip.open(f"block_{self._blocks:06d}.npy", "w", force_zip64=True) as member:
+                np.lib.format.write_array(member, np.ascontiguousarray(block).view(dtype).reshape(-1))
+        self._blocks += 1
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            self._zip.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_run(path):
+    """
+    Read a run file back. Returns a dict with "p" and "q" of shape (n,) and
+    "evtable" and "xtable" of shape (n, balls + 1, strikes + 1).
+    """
+    if path.endswith(".parquet"):
+        if pyarrow is None:
+            raise ImportError("reading .parquet runs needs pyarrow")
+        table = pyarrow.parquet.read_table(path)
+        names = table.column_names
+        columns = {name: table.column(name).to_numpy() for name in names}
+    else:
+        with np.load(path) as run:
+            blocks = [run[name] for name in sorted(run.files)]
+        names = list(blocks[0].dtype.names) if blocks else column_names((5, 4))
+        data = np.concatenate(blocks) if blocks else np.empty(0, dtype=[(name, np.float64) for name in names])
+        columns = {name: data[name] for name in names}
+
+    cells = [name[3:] for name in names if name.startswith("ev_")]
+    shape = tuple(max(int(cell.split("_")[i]) for cell in cells) + 1 for i in range(2))
+    n = len(columns["p"])
+    return {
+        "p": columns["p"],
+        "q": columns["q"],
+        "evtable": np.stack([columns[f"ev_{cell}"] for cell in cells], axis=1).reshape((n,) + shape),
+        "xtable": np.stack([columns[f"x_{cell}"] for cell in cells], axis=1).reshape((n,) + shape),
+    }
+
+
+def plot_run(path, out=None, dpi=150):
+    """q against p for a run file, saved to out if given, else shown."""
+    import matplotlib.pyplot as plt
+
+    run = load_run(path)
+    order = np.argsort(run["p"])
+    p, q = run["p"][order], run["q"][order]
+    imax = np.argmax(q)
+
+    fig, ax = plt.subplots()
+    ax.plot(p, q)
+    ax.axvline(p[imax], color='r', linestyle='--')
+    ax.set_xlabel("p")
+    ax.set_ylabel("q")
+    ax.set_title(f"q vs p, {len(p)} points, best p = {p[imax]:.6f}")
+    if out is None:
+        plt.show()
+    else:
+        fig.savefig(out, dpi=dpi)
+    plt.close(fig)
+
+
+def main():
+
+    if len(sys.argv) < 2:
+        print(__doc__.strip().splitlines()[-2])
+        sys.exit(1)
+    path = sys.argv[1]
+    num_points = int(sys.argv[2]) if len(sys.argv) > 2 else 10**6
+    plot_file = sys.argv[3] if len(sys.argv) > 3 else None
+
+    from main import scan
+
+    start = time.perf_counter()
+    with RunRecorder(path) as recorder:
+        scan(0.01, 0.99, num_points, recorder=recorder)
+    print(f"recorded {recorder.rows} evaluations to {path} in {time.perf_counter() - start:.2f} seconds")
+
+    start = time.perf_counter()
+    run = load_run(path)
+    imax = np.argmax(run["q"])
+    print(f"read back in {time.perf_counter() - start:.2f} seconds: best p = {run['p'][imax]}, q = {run['q'][imax]}")
+
+    if plot_file is not None:
+        plot_run(path, plot_file)
+        print(f"plot written to {plot_file}")
+
+
+if __name__ == "__main__":
+    main()